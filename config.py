@@ -1,45 +1,78 @@
 import os
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any
 
 import dotenv
 
-dotenv.load_dotenv()
+_ENV = os.environ
 
+# .env 只解析一次；多 worker 启动时子进程继承已加载的环境变量
+_DOTENV_LOADED_FLAG = "_MMDOCPARSER_DOTENV_LOADED"
+if not _ENV.get(_DOTENV_LOADED_FLAG):
+    dotenv.load_dotenv()
+    _ENV[_DOTENV_LOADED_FLAG] = "1"
+
+
+# 以下两个函数返回 dataclass 字段声明而非配置值，环境变量在 Settings 实例化时读取；
+# 返回类型标注为 Any，使字段仍可按配置值的类型声明
+def _env_str(key: str, default: str) -> Any:
+    """声明从环境变量读取的字符串配置项"""
+    return field(default_factory=lambda: _ENV.get(key, default))
+
+
+def _env_int(key: str, default: int) -> Any:
+    """声明从环境变量读取的整数配置项"""
+    return field(default_factory=lambda: int(_ENV.get(key, default)))
+
+
+@dataclass(frozen=True)
 class Settings:
     """应用配置类"""
-    HOST: str = os.getenv("HOST", "127.0.0.1")
-    PORT: int = int(os.getenv("PORT", "8000"))
-    WORKERS: int = int(os.getenv("WORKERS", "4"))
-
-    # CORS配置
-    CORS_ORIGINS: list[str] = os.getenv("CORS_ORIGINS", "*").split(",")
+    HOST: str = _env_str("HOST", "127.0.0.1")
+    PORT: int = _env_int("PORT", 8000)
+    WORKERS: int = _env_int("WORKERS", 4)
 
     # 文件限制
-    MAX_FILE_SIZE: int = int(os.getenv("MAX_FILE_SIZE", str(100 * 1024 * 1024)))  # 100MB
-    SUPPORTED_FORMATS: list[str] = ["pdf", "docx", "doc","xlsx"]
+    MAX_FILE_SIZE: int = _env_int("MAX_FILE_SIZE", 100 * 1024 * 1024)  # 100MB
+    SUPPORTED_FORMATS: frozenset[str] = frozenset({"pdf", "docx", "doc", "xlsx"})
 
     # Redis配置
-    REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
-    TASK_QUEUE: str = os.getenv("TASK_QUEUE", "document_parsing_queue")
-    TASK_STATUS_PREFIX: str = os.getenv("TASK_STATUS_PREFIX", "task_status")
+    REDIS_URL: str = _env_str("REDIS_URL", "redis://localhost:6379")
+    TASK_QUEUE: str = _env_str("TASK_QUEUE", "document_parsing_queue")
+    TASK_STATUS_PREFIX: str = _env_str("TASK_STATUS_PREFIX", "task_status")
 
     # S3配置
-    S3_ENDPOINT: str = os.getenv("S3_ENDPOINT", "http://localhost:9000")
-    S3_ACCESS_KEY: str = os.getenv("S3_ACCESS_KEY", "minioadmin")
-    S3_SECRET_KEY: str = os.getenv("S3_SECRET_KEY", "minioadmin")
-    S3_BUCKET: str = os.getenv("S3_BUCKET", "documents")
-    S3_REGION: str = os.getenv("S3_REGION", "us-east-1")
+    S3_ENDPOINT: str = _env_str("S3_ENDPOINT", "http://localhost:9000")
+    S3_ACCESS_KEY: str = _env_str("S3_ACCESS_KEY", "minioadmin")
+    S3_SECRET_KEY: str = _env_str("S3_SECRET_KEY", "minioadmin")
+    S3_BUCKET: str = _env_str("S3_BUCKET", "documents")
+    S3_REGION: str = _env_str("S3_REGION", "us-east-1")
+    S3_MAX_CONNECTIONS: int = _env_int("S3_MAX_CONNECTIONS", 64)  # 每个进程的S3连接池大小
 
     # 任务配置
-    MAX_FILES_PER_REQUEST: int = int(os.getenv("MAX_FILES_PER_REQUEST", "20"))
-    TASK_TIMEOUT: int = int(os.getenv("TASK_TIMEOUT", "3600"))  # 1小时
+    MAX_FILES_PER_REQUEST: int = _env_int("MAX_FILES_PER_REQUEST", 20)
+    TASK_TIMEOUT: int = _env_int("TASK_TIMEOUT", 3600)  # 1小时
+
+    # 解析配置
+    DOCX_WORKERS: int = _env_int("DOCX_WORKERS", min(os.cpu_count() or 1, 4))  # DOCX转换进程数，每个进程各自加载Docling
+    DOCX_CACHE_ENTRIES: int = _env_int("DOCX_CACHE_ENTRIES", 128)  # DOCX解析结果缓存条数，为0时不缓存
+    PDF_WORKERS: int = _env_int("PDF_WORKERS", min(os.cpu_count() or 1, 4))  # PDF解析进程数，每个进程各自加载模型
+    PDF_OUTPUT_DIR: str = _env_str("PDF_OUTPUT_DIR", "")  # PDF中间图片目录，为空时使用项目下的 output 目录
 
     # 模型配置
-    LLM_MODEL_NAME: str = os.getenv("LLM_MODEL_NAME", "gpt-4o")
-    LLM_BASE_URL: str = os.getenv("LLM_BASE_URL", "http://192.168.120.2:4000")
-    LLM_API_KEY: str = os.getenv("LLM_API_KEY", "sk-")
+    LLM_MODEL_NAME: str = _env_str("LLM_MODEL_NAME", "gpt-4o")
+    LLM_BASE_URL: str = _env_str("LLM_BASE_URL", "http://192.168.120.2:4000")
+    LLM_API_KEY: str = _env_str("LLM_API_KEY", "sk-")
+
+    VLLM_MODEL_NAME: str = _env_str("VLLM_MODEL_NAME", "qwen2.5-vl-7b-instruct")
+    VLLM_API_KEY: str = _env_str("VLLM_API_KEY", "sk-")
+    VLLM_BASE_URL: str = _env_str("VLLM_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1")
 
-    VLLM_MODEL_NAME: str = os.getenv("VLLM_MODEL_NAME", "qwen2.5-vl-7b-instruct")
-    VLLM_API_KEY: str = os.getenv("VLLM_API_KEY", "sk-")
-    VLLM_BASE_URL: str = os.getenv("VLLM_BASE_URL", "https://dashscope.aliyuncs.com/compatible-mode/v1")
+    # CORS配置，首次访问时解析并缓存
+    @cached_property
+    def CORS_ORIGINS(self) -> list[str]:
+        """允许的跨域来源列表"""
+        return _ENV.get("CORS_ORIGINS", "*").split(",")
 
 settings = Settings()
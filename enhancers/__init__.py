@@ -1,5 +1,7 @@
+from .base_models import InformationEnhancer, JsonResponseFormat
 from .enhancer_registry import (
     ENHANCER_REGISTRY,
+    enhance_chunks,
     get_enhancer,
     get_enhancer_class,
     get_supported_modalities,
@@ -9,6 +11,9 @@ from .enhancer_registry import (
 
 __all__ = [
     "ENHANCER_REGISTRY",
+    "InformationEnhancer",
+    "JsonResponseFormat",
+    "enhance_chunks",
     "get_enhancer",
     "get_enhancer_class",
     "get_supported_modalities",
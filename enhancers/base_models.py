@@ -1,25 +1,48 @@
+import asyncio
+import functools
+import random
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import TYPE_CHECKING, Any, TypeVar
 
-from openai import AsyncOpenAI
 from pydantic import BaseModel
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from parsers.base_models import ChunkData
 
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
 MAX_RETRIES = 3
 WAIT_TIME = 4
 WAIT_MAX_TIME = 15
 MULTIPLIER = 1
+WAIT_JITTER = 1
+
+
+def _retry_delay(attempt: int) -> float:
+    """计算第 attempt 次失败后的等待时间（带抖动的指数退避）"""
+    delay = min(WAIT_MAX_TIME, max(WAIT_TIME, MULTIPLIER * (1 << (attempt - 1))))
+    return delay + random.uniform(0, WAIT_JITTER)  # nosec B311 - 抖动无需密码学随机数
+
+@functools.lru_cache(maxsize=8)
+def _get_client(base_url: str, api_key: str) -> "AsyncOpenAI":
+    """按 (base_url, api_key) 共享 AsyncOpenAI 客户端，复用其连接池"""
+    # openai 导入开销较大，延迟到首次创建客户端时再导入
+    from openai import AsyncOpenAI
+    return AsyncOpenAI(api_key=api_key, base_url=base_url)
 
 class JsonResponseFormat(BaseModel):
     """JSON 响应格式"""
     description:str
 
+ResponseFormatT = TypeVar("ResponseFormatT", bound=BaseModel)
+
 class InformationEnhancer(ABC):
     """信息增强器基类"""
+    # 子类同样应声明 __slots__（无新增属性时为空元组），否则会重新引入 __dict__
+    __slots__ = ("client", "model_name", "system_prompt")
+
     def __init__(self, model_name: str, base_url: str, api_key: str):
-        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
+        self.client = _get_client(base_url, api_key)
         self.model_name = model_name
         self.system_prompt = "You are a helpful assistant."
 
@@ -28,17 +51,30 @@ class InformationEnhancer(ABC):
         """增强信息"""
         pass
 
-    @retry(stop=stop_after_attempt(MAX_RETRIES), wait=wait_exponential(multiplier=MULTIPLIER, min=WAIT_TIME, max=WAIT_MAX_TIME))
-    async def get_structured_response(self, user_prompt: list[dict[str, Any]], response_format: JsonResponseFormat) -> str|None:
-        """获取结构化响应"""
+    async def get_structured_response(self, user_prompt: list[dict[str, Any]], response_format: type[ResponseFormatT]) -> ResponseFormatT|None:
+        """获取结构化响应，失败时最多重试 MAX_RETRIES 次"""
+        attempt = 0
+        while True:
+            try:
+                return await self._request_structured_response(user_prompt, response_format)
+            except Exception:
+                attempt += 1
+                if attempt >= MAX_RETRIES:
+                    raise
+                await asyncio.sleep(_retry_delay(attempt))
+
+    async def _request_structured_response(self, user_prompt: list[dict[str, Any]], response_format: type[ResponseFormatT]) -> ResponseFormatT|None:
+        """发起一次结构化响应请求"""
+        # parse() 会处理 finish_reason 为 length / content_filter 的情况，响应模型使用模块级的类
         response = await self.client.chat.completions.parse(
             model=self.model_name,
             messages=[
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": user_prompt} # type: ignore
             ],
-            response_format=response_format # type: ignore
+            response_format=response_format
         )
-        if response.choices[0].message.refusal:
-            raise ValueError(f"模型拒绝了请求: {response.choices[0].message.refusal}")
-        return response.choices[0].message.parsed
+        message = response.choices[0].message
+        if message.refusal:
+            raise ValueError(f"模型拒绝了请求: {message.refusal}")
+        return message.parsed
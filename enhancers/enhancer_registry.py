@@ -4,17 +4,27 @@
 提供基于装饰器的解析器自动注册机制，支持多种文件格式的解析器注册和查找。
 """
 
+import asyncio
 import logging
 from collections.abc import Callable
 
 from config import settings
 from enhancers.base_models import InformationEnhancer
-from parsers.base_models import ChunkType
+from parsers.base_models import ChunkData, ChunkType
 
 logger = logging.getLogger(__name__)
 
 # 全局解析器注册表
-ENHANCER_REGISTRY: dict[str, type[InformationEnhancer]] = {}
+ENHANCER_REGISTRY: dict[ChunkType, type[InformationEnhancer]] = {}
+
+# 信息增强器实例缓存，每种模态只创建一个实例
+_INSTANCE_CACHE: dict[ChunkType, InformationEnhancer] = {}
+
+# 各模态使用的模型配置 (model_name, base_url, api_key)，未列出的模态使用 LLM 配置
+_MODEL_CONFIGS: dict[ChunkType, tuple[str, str, str]] = {
+    ChunkType.IMAGE: (settings.VLLM_MODEL_NAME, settings.VLLM_BASE_URL, settings.VLLM_API_KEY),
+}
+_DEFAULT_MODEL_CONFIG = (settings.LLM_MODEL_NAME, settings.LLM_BASE_URL, settings.LLM_API_KEY)
 
 
 def register_enhancer(modalities: list[ChunkType]) -> Callable[[type[InformationEnhancer]], type[InformationEnhancer]]:
@@ -39,12 +49,13 @@ def register_enhancer(modalities: list[ChunkType]) -> Callable[[type[Information
 
         # 注册到全局注册表
         for modality in modalities:
-            modality_type = modality.value.lower()  # 统一转换为小写
-            if modality_type in ENHANCER_REGISTRY:
-                logger.error(f"覆盖已存在的信息增强器: {modality_type} -> {cls.__name__}")
-                raise ValueError(f"尝试覆盖已存在的信息增强器: {modality_type} -> {cls.__name__}")
-            ENHANCER_REGISTRY[modality_type] = cls
-            logger.info(f"注册信息增强器: {modality_type} -> {cls.__name__}")
+            # 直接以枚举成员作为键，查找时无需再做字符串转换
+            if modality in ENHANCER_REGISTRY:
+                logger.error(f"覆盖已存在的信息增强器: {modality.value} -> {cls.__name__}")
+                raise ValueError(f"尝试覆盖已存在的信息增强器: {modality.value} -> {cls.__name__}")
+            ENHANCER_REGISTRY[modality] = cls
+            _INSTANCE_CACHE.pop(modality, None)
+            logger.info(f"注册信息增强器: {modality.value} -> {cls.__name__}")
 
         return cls
 
@@ -52,7 +63,7 @@ def register_enhancer(modalities: list[ChunkType]) -> Callable[[type[Information
 
 def get_enhancer(modality: ChunkType) -> InformationEnhancer | None:
     """
-    根据模态类型获取合适的信息增强器实例
+    根据模态类型获取合适的信息增强器实例，同一模态复用同一个实例
 
     Args:
         modality: 模态类型
@@ -60,23 +71,55 @@ def get_enhancer(modality: ChunkType) -> InformationEnhancer | None:
     Returns:
         信息增强器实例，如果没有找到则返回 None
     """
-    modality_type = modality.value.lower()
+    enhancer = _INSTANCE_CACHE.get(modality)
+    if enhancer is not None:
+        return enhancer
 
-    if modality_type not in ENHANCER_REGISTRY:
+    enhancer_class = ENHANCER_REGISTRY.get(modality)
+    if enhancer_class is None:
         logger.warning(f"未找到支持 {modality} 格式的信息增强器")
         return None
 
-    enhancer_class = ENHANCER_REGISTRY[modality_type]
     try:
-        match modality_type:
-            case ChunkType.IMAGE.value.lower():
-                return enhancer_class(settings.VLLM_MODEL_NAME, settings.VLLM_BASE_URL, settings.VLLM_API_KEY)
-            case _:
-                return enhancer_class(settings.LLM_MODEL_NAME, settings.LLM_BASE_URL, settings.LLM_API_KEY)
+        enhancer = enhancer_class(*_MODEL_CONFIGS.get(modality, _DEFAULT_MODEL_CONFIG))
     except Exception as e:
         logger.error(f"创建信息增强器实例失败: {enhancer_class.__name__}, 错误: {e}")
         return None
 
+    _INSTANCE_CACHE[modality] = enhancer
+    return enhancer
+
+async def enhance_chunks(chunks: list[ChunkData], concurrency: int = 16) -> list[ChunkData]:
+    """
+    并发增强一批信息块，返回结果与输入顺序一致
+
+    Args:
+        chunks: 待增强的信息块列表
+        concurrency: 同时进行的增强请求上限
+
+    Returns:
+        增强后的信息块列表，没有对应增强器的块原样返回
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def enhance_one(enhancer: InformationEnhancer, chunk: ChunkData) -> ChunkData:
+        async with semaphore:
+            return await enhancer.enhance(chunk)
+
+    # 只为本批出现的模态各获取一次增强器；没有增强器的块不创建协程、也不占用信号量
+    enhancers = {chunk_type: get_enhancer(chunk_type) for chunk_type in {chunk.type for chunk in chunks}}
+    result = list(chunks)
+    pending = []
+    for index, chunk in enumerate(chunks):
+        enhancer = enhancers[chunk.type]
+        if enhancer is not None:
+            pending.append((index, enhance_one(enhancer, chunk)))
+    if pending:
+        enhanced = await asyncio.gather(*(task for _, task in pending))
+        for (index, _), chunk in zip(pending, enhanced, strict=True):
+            result[index] = chunk
+    return result
+
 def get_supported_modalities() -> list[str]:
     """
     获取所有支持的模态类型
@@ -84,7 +127,7 @@ def get_supported_modalities() -> list[str]:
     Returns:
         支持的模态类型列表
     """
-    return list(ENHANCER_REGISTRY.keys())
+    return [modality.value for modality in ENHANCER_REGISTRY]
 
 
 def get_enhancer_class(modality: ChunkType) -> type[InformationEnhancer] | None:
@@ -97,7 +140,7 @@ def get_enhancer_class(modality: ChunkType) -> type[InformationEnhancer] | None:
     Returns:
         信息增强器类，如果没有找到则返回 None
     """
-    return ENHANCER_REGISTRY.get(modality.value.lower())
+    return ENHANCER_REGISTRY.get(modality)
 
 
 def list_registered_enhancers() -> dict[str, str]:
@@ -107,4 +150,4 @@ def list_registered_enhancers() -> dict[str, str]:
     Returns:
         模态类型到信息增强器类名的映射字典
     """
-    return {modality: cls.__name__ for modality, cls in ENHANCER_REGISTRY.items()}
+    return {modality.value: cls.__name__ for modality, cls in ENHANCER_REGISTRY.items()}
@@ -42,6 +42,7 @@ async def setup_services(app: Sanic[Config, SimpleNamespace], _: AbstractEventLo
                 secret_key=settings.S3_SECRET_KEY,
                 bucket=settings.S3_BUCKET,
                 region=settings.S3_REGION,
+                max_pool_connections=settings.S3_MAX_CONNECTIONS,
             )
         )
 
@@ -83,11 +84,7 @@ async def upload_documents(request: Request) -> HTTPResponse:
         task_id = str(uuid.uuid4())
 
         # 3. 并发上传文件到S3
-        upload_tasks = [
-            request.app.ctx.s3.upload_file(filename, content)
-            for filename, content in validated_data["files"]
-        ]
-        presigned_urls = await asyncio.gather(*upload_tasks)
+        presigned_urls = await request.app.ctx.s3.upload_files(validated_data["files"])
 
         # 4. 准备任务数据
         task_data = {
@@ -97,14 +94,11 @@ async def upload_documents(request: Request) -> HTTPResponse:
             "created_at": asyncio.get_event_loop().time()
         }
 
-        # 5. 推送任务到队列
-        success = await request.app.ctx.task_manager.push_task(task_data)
+        # 5. 设置任务状态并推送任务到队列
+        success = await request.app.ctx.task_manager.submit_task(task_data, "pending")
         if not success:
             raise Exception("推送任务到队列失败")
 
-        # 6. 设置任务状态
-        await request.app.ctx.task_manager.set_task_status(task_id, "pending")
-
         logger.info(f"[Submit] 任务已提交: {task_id}, 文件数: {len(validated_data['files'])}")
 
         return json_response({
@@ -219,7 +213,7 @@ def main() -> None:
     print(f"  - 主机: {settings.HOST}")
     print(f"  - 端口: {settings.PORT}")
     print(f"  - 工作进程: {settings.WORKERS}")
-    print(f"  - 支持格式: {', '.join(settings.SUPPORTED_FORMATS)}")
+    print(f"  - 支持格式: {', '.join(sorted(settings.SUPPORTED_FORMATS))}")
     print(f"  - 最大文件数: {settings.MAX_FILES_PER_REQUEST}")
     print(f"  - 最大文件大小: {settings.MAX_FILE_SIZE // (1024*1024)}MB")
 
@@ -1,29 +1,67 @@
 # Parsers package
 
-from .base_models import ChunkData, ChunkType, DocumentData, DocumentParser
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+from .base_models import (
+    ChunkData,
+    ChunkType,
+    DocumentData,
+    DocumentParser,
+)
+from .content_cache import ContentCache
 from .parser_registry import (
     PARSER_REGISTRY,
     get_parser,
     get_supported_formats,
     list_registered_parsers,
+    parse_many,
     register_parser,
+    warm_up_parsers,
 )
 
 __all__ = [
     'DocumentData',
     'DocumentParser',
     'ChunkData',
+    'ContentCache',
     'ChunkType',
     'PARSER_REGISTRY',
     'register_parser',
     'get_parser',
+    'parse_many',
     'get_supported_formats',
     'list_registered_parsers',
+    'warm_up_parsers',
     'load_all_parsers',
+    'DocxDocumentParser',
+    'ExcelParser',
+    'PdfDocumentParser',
 ]
 
+if TYPE_CHECKING:
+    from .docx_parser import DocxDocumentParser
+    from .excel_parser import ExcelParser
+    from .pdf_parser import PdfDocumentParser
+
+# 具体解析器按需导入（PEP 562），未用到的格式不会加载 docling / MinerU 等重依赖
+_LAZY_PARSERS = {
+    'DocxDocumentParser': '.docx_parser',
+    'ExcelParser': '.excel_parser',
+    'PdfDocumentParser': '.pdf_parser',
+}
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_PARSERS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
 def load_all_parsers() -> list[str]:
     """加载所有解析器"""
     from .docx_parser import DocxDocumentParser
     from .excel_parser import ExcelParser
-    return [DocxDocumentParser.__name__, ExcelParser.__name__]
+    from .pdf_parser import PdfDocumentParser
+    return [DocxDocumentParser.__name__, ExcelParser.__name__, PdfDocumentParser.__name__]
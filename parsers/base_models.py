@@ -1,11 +1,10 @@
 import logging
 from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Any
 
-from pydantic import BaseModel, Field
-
 logger = logging.getLogger(__name__)
 
 
@@ -16,47 +15,58 @@ class ChunkType(str, Enum):
     TABLE = "table"
     FORMULA = "formula"
 
-class TableDataItem(BaseModel):
+# 解析结果只在进程内构造，使用 slots dataclass 而非 Pydantic 模型以省去校验开销
+@dataclass(slots=True, kw_only=True)
+class TableDataItem:
     """表格数据类"""
     rows: int  # 行数
     columns: int  # 列数
-    grid: list[list[str]] = Field(default_factory=list)  # 网格数据
-    row_headers: list[Any] = Field(default_factory=list)  # 行头
-    column_headers: list[Any] = Field(default_factory=list)  # 列头
-    data: list[list[str]] = Field(default_factory=list)  # 数据
-    caption: list[str] = Field(default_factory=list)  # 表格标题
-    footnote: list[str] = Field(default_factory=list)  # 表格注脚
+    grid: list[str] = field(default_factory=list)  # 网格数据，按行展开，长度为 rows * columns
+    row_headers: list[Any] = field(default_factory=list)  # 行头
+    column_headers: list[Any] = field(default_factory=list)  # 列头
+    data: list[str] = field(default_factory=list)  # 数据，按行展开
+    caption: list[str] = field(default_factory=list)  # 表格标题
+    footnote: list[str] = field(default_factory=list)  # 表格注脚
+
+    def cell(self, row: int, column: int) -> str:
+        """获取第 row 行第 column 列（从 0 开始）的单元格内容"""
+        return self.grid[row * self.columns + column]
 
-class TextDataItem(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class TextDataItem:
     """文本数据类"""
     text: str  # 文本
     text_level: int|None = None  # 文本级别
 
-class ImageDataItem(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ImageDataItem:
     """图片数据类"""
     uri: str|None = None  # 图片 URI
-    caption: list[str] = Field(default_factory=list)  # 图片标题
-    footnote: list[str] = Field(default_factory=list)  # 图片注脚
+    caption: list[str] = field(default_factory=list)  # 图片标题
+    footnote: list[str] = field(default_factory=list)  # 图片注脚
 
-class FormulaDataItem(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class FormulaDataItem:
     """公式数据类"""
     text: str  # 公式
     text_format: str|None = None  # 公式格式
 
-class ChunkData(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ChunkData:
     """块数据类"""
     type: ChunkType
     name: str|None = None
     content: TableDataItem|TextDataItem|ImageDataItem|FormulaDataItem
     description: str|None = None
 
-class DocumentData(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class DocumentData:
     """解析结果类"""
     title: str|None = None
-    texts: list[ChunkData] = Field(default_factory=list)
-    tables: list[ChunkData] = Field(default_factory=list)
-    images: list[ChunkData] = Field(default_factory=list)
-    formulas: list[ChunkData] = Field(default_factory=list)
+    texts: list[ChunkData] = field(default_factory=list)
+    tables: list[ChunkData] = field(default_factory=list)
+    images: list[ChunkData] = field(default_factory=list)
+    formulas: list[ChunkData] = field(default_factory=list)
     processing_time: float = 0
     success: bool
     error_message: str | None = None
@@ -68,3 +78,7 @@ class DocumentParser(ABC):
     async def parse(self, file_path: Path) -> DocumentData:
         """解析文档"""
         pass
+
+    async def warm_up(self) -> None:
+        """预热解析器，在处理第一个请求前提前加载模型等耗时资源，默认无需预热"""
+        return None
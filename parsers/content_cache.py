@@ -0,0 +1,98 @@
+"""
+解析结果缓存模块
+
+按文件内容的 SHA-256 摘要与文件名缓存解析结果，同一文件重复解析时直接返回缓存副本。
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+from .base_models import DocumentData
+
+logger = logging.getLogger(__name__)
+
+
+class ContentCache:
+    """进程内的解析结果 LRU 缓存，以文件内容摘要和文件名为键
+
+    file_key 通常在线程池中调用，get/set 在事件循环中调用，内部状态由锁保护。
+    """
+
+    def __init__(self, max_entries: int = 128) -> None:
+        """
+        初始化缓存
+
+        Args:
+            max_entries: 最多缓存的解析结果数量
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, DocumentData] = OrderedDict()
+        # (路径, mtime_ns, 文件大小) -> 内容摘要，文件未变化时无需重新计算哈希
+        self._digests: OrderedDict[tuple[str, int, int], str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def file_key(self, file_path: str | Path) -> str:
+        """
+        计算文件的缓存键
+
+        Args:
+            file_path: 文件路径
+
+        Returns:
+            str: 文件内容的 SHA-256 十六进制摘要加文件名；解析结果的标题可能取自文件名，
+                内容相同但名称不同的文件不能共用缓存
+        """
+        stat = os.stat(file_path)
+        signature = (os.fspath(file_path), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            digest = self._digests.get(signature)
+            if digest is not None:
+                self._digests.move_to_end(signature)
+
+        if digest is None:
+            # 分块计算摘要，避免把整个文件读入内存；哈希计算在锁外进行
+            with open(file_path, "rb") as f:
+                digest = hashlib.file_digest(f, "sha256").hexdigest()
+            with self._lock:
+                self._digests[signature] = digest
+                if len(self._digests) > self.max_entries:
+                    self._digests.popitem(last=False)
+        return f"{digest}:{os.path.basename(file_path)}"
+
+    def get(self, key: str) -> DocumentData | None:
+        """
+        获取缓存的解析结果
+
+        Args:
+            key: 缓存键
+
+        Returns:
+            DocumentData | None: 解析结果的副本，未命中时返回 None
+        """
+        with self._lock:
+            document_data = self._entries.get(key)
+            if document_data is None:
+                return None
+            self._entries.move_to_end(key)
+        logger.debug("解析结果缓存命中: %s", key)
+        return copy.deepcopy(document_data)
+
+    def set(self, key: str, document_data: DocumentData) -> None:
+        """
+        写入解析结果
+
+        Args:
+            key: 缓存键
+            document_data: 解析结果，缓存中保存其副本
+        """
+        document_data = copy.deepcopy(document_data)
+        with self._lock:
+            self._entries[key] = document_data
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
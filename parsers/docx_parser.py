@@ -5,27 +5,20 @@ DOCX文档解析器模块
 支持标题、段落、列表、表格和图片的识别与输出。
 """
 
+from __future__ import annotations
+
 import asyncio
+import functools
 import logging
+import multiprocessing
 import time
+from collections.abc import Callable
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
+from typing import TYPE_CHECKING, Any
 
-from docling.datamodel.base_models import InputFormat
-from docling.document_converter import DocumentConverter, WordFormatOption
-from docling.pipeline.simple_pipeline import SimplePipeline
-from docling_core.types.doc.document import (
-    CodeItem,
-    DocItemLabel,
-    DoclingDocument,
-    FormulaItem,
-    ListItem,
-    PictureItem,
-    SectionHeaderItem,
-    TableItem,
-    TextItem,
-    TitleItem,
-)
-
+from config import settings
 from parsers.base_models import (
     ChunkData,
     ChunkType,
@@ -36,11 +29,100 @@ from parsers.base_models import (
     TableDataItem,
     TextDataItem,
 )
+from parsers.content_cache import ContentCache
 from parsers.parser_registry import register_parser
 
+if TYPE_CHECKING:
+    from docling.document_converter import DocumentConverter
+    from docling_core.types.doc.document import (
+        CodeItem,
+        DoclingDocument,
+        FormulaItem,
+        ListItem,
+        PictureItem,
+        SectionHeaderItem,
+        TableItem,
+        TextItem,
+        TitleItem,
+    )
+
 logger = logging.getLogger(__name__)
 
 
+class _DocLabel:
+    """用到的 DocItemLabel 取值，DocItemLabel 是 str 枚举，可直接与字符串比较"""
+    TITLE = "title"
+    FORMULA = "formula"
+
+
+@functools.lru_cache(maxsize=1)
+def _get_docx_converter() -> DocumentConverter:
+    """获取进程内共享的DOCX转换器，避免每个解析器实例重复构建转换管道"""
+    # Docling 导入耗时数秒，延迟到首次转换（通常在进程池的子进程中）时再导入
+    from docling.datamodel.base_models import InputFormat
+    from docling.document_converter import DocumentConverter, WordFormatOption
+    from docling.pipeline.simple_pipeline import SimplePipeline
+
+    converter = DocumentConverter(
+        format_options={InputFormat.DOCX: WordFormatOption(pipeline_cls=SimplePipeline)},
+        allowed_formats=[InputFormat.DOCX]
+    )
+    # 预先初始化DOCX管道，否则首次 convert 时才会构建
+    converter.initialize_pipeline(InputFormat.DOCX)
+    return converter
+
+
+def _init_docx_worker() -> None:
+    """进程池子进程的初始化函数，在进程启动时预热转换器"""
+    _get_docx_converter()
+
+
+# DOCX转换是CPU密集的纯Python代码，放到进程池中才能在多个文件间真正并行
+_DOCX_EXECUTOR: ProcessPoolExecutor | None = None
+
+
+def _get_docx_executor() -> ProcessPoolExecutor:
+    """获取DOCX转换进程池，首次使用时创建"""
+    global _DOCX_EXECUTOR
+    if _DOCX_EXECUTOR is None:
+        # 主进程已运行事件循环和线程池，fork 可能复制被其他线程持有的锁，改用 spawn 启动干净的子进程
+        _DOCX_EXECUTOR = ProcessPoolExecutor(
+            max_workers=settings.DOCX_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_docx_worker
+        )
+    return _DOCX_EXECUTOR
+
+
+async def _run_in_docx_executor[T](func: Callable[..., T], *args: Any) -> T:
+    """在DOCX转换进程池中执行任务
+
+    子进程异常退出会使整个进程池损坏，之后提交的任务都会失败；
+    此时丢弃该进程池，当前任务照常报错，后续任务使用重新创建的进程池。
+    """
+    global _DOCX_EXECUTOR
+    executor = _get_docx_executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        # 同一进程池上的多个任务会同时失败，只由第一个任务丢弃进程池
+        if _DOCX_EXECUTOR is executor:
+            logger.warning("DOCX process pool is broken, recreating it for later tasks")
+            _DOCX_EXECUTOR = None
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def _convert_docx(file_path: str | Path) -> DocumentData:
+    """在进程池中执行DOCX转换并直接提取为DocumentData
+
+    Docling没有流式回调接口，只能先构建DoclingDocument；在子进程内完成提取后，
+    只需把体积更小的解析结果传回主进程，无需序列化整棵文档树。
+    """
+    doc_data = _get_docx_converter().convert(file_path).document
+    return DocxDocumentParser()._process_content(doc_data)
+
+
 @register_parser(['.docx'])
 class DocxDocumentParser(DocumentParser):
     """DOCX文档解析器
@@ -49,13 +131,16 @@ class DocxDocumentParser(DocumentParser):
     支持异步解析接口，符合DocumentParser抽象基类。
     """
 
-    def __init__(self) -> None:
-        """初始化解析器"""
+    def __init__(self, cache: ContentCache | None = None) -> None:
+        """初始化解析器
+
+        Args:
+            cache: 解析结果缓存，命中时跳过转换；未提供时按 DOCX_CACHE_ENTRIES 配置创建
+        """
         super().__init__()
-        self._converter = DocumentConverter(
-            format_options={InputFormat.DOCX: WordFormatOption(pipeline_cls=SimplePipeline)},
-            allowed_formats=[InputFormat.DOCX]
-        )
+        if cache is None and settings.DOCX_CACHE_ENTRIES > 0:
+            cache = ContentCache(settings.DOCX_CACHE_ENTRIES)
+        self._cache = cache
         logger.debug("DocxDocumentParser initialized with SimplePipeline")
 
     async def parse(self, file_path: Path) -> DocumentData:
@@ -67,60 +152,35 @@ class DocxDocumentParser(DocumentParser):
         Returns:
             DocumentData: 解析结果，包含标题、内容、处理时间和错误信息
         """
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
-            # 执行同步转换（在异步中运行）
             loop = asyncio.get_event_loop()
-            result = await loop.run_in_executor(None, self._converter.convert, file_path)
-            doc_data = result.document
-
-            # 并行处理不同类型的内容
-            document_data = await self._process_content_parallel(doc_data)
-
-            processing_time = time.time() - start_time
+            cache_key = None
+            if self._cache is not None:
+                cache_key = await loop.run_in_executor(None, self._cache.file_key, file_path)
+                cached = self._cache.get(cache_key)
+                if cached is not None:
+                    cached.processing_time = time.perf_counter() - start_time
+                    return cached
+
+            # 在进程池中执行转换与内容提取
+            document_data = await _run_in_docx_executor(_convert_docx, file_path)
+
+            processing_time = time.perf_counter() - start_time
             document_data.processing_time = processing_time
+            if self._cache is not None and cache_key is not None:
+                self._cache.set(cache_key, document_data)
             logger.info(f"Successfully parsed DOCX: {file_path} (took {processing_time:.2f}s)")
             return document_data
 
         except Exception as e:
             raise Exception(f"Failed to parse DOCX file {file_path}") from e
 
-    async def _process_content_parallel(self, doc_data: DoclingDocument) -> DocumentData:
-        """并行处理文档内容"""
-        # 创建任务列表
-        tasks = []
-
-        # 添加图片处理任务
-        if doc_data.pictures:
-            tasks.append(self._extract_images_async(doc_data.pictures))
-
-        # 添加表格处理任务
-        if doc_data.tables:
-            tasks.append(self._extract_tables_async(doc_data.tables))
-
-        # 添加文本处理任务
-        if doc_data.texts:
-            tasks.append(self._extract_texts_async(doc_data.texts))
-
-        # 并行执行所有任务
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 处理结果
-        images: list[ChunkData] = []
-        tables: list[ChunkData] = []
-        texts: list[ChunkData] = []
-
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Error processing content type {i}: {result}")
-                continue
-            if isinstance(result, list):
-                if result and result[0].type == ChunkType.IMAGE:
-                    images = result
-                elif result and result[0].type == ChunkType.TABLE:
-                    tables = result
-                elif result and result[0].type == ChunkType.TEXT:
-                    texts = result
+    def _process_content(self, doc_data: DoclingDocument) -> DocumentData:
+        """处理文档内容，单类内容提取失败时不影响其他内容"""
+        images = self._extract_safely(self._extract_images, doc_data.pictures)
+        tables = self._extract_safely(self._extract_tables, doc_data.tables)
+        texts = self._extract_safely(self._extract_texts, doc_data.texts)
 
         # 提取标题
         title = self._extract_title(doc_data)
@@ -133,6 +193,17 @@ class DocxDocumentParser(DocumentParser):
             success=True
         )
 
+    @staticmethod
+    def _extract_safely(extractor: Callable[[Any], list[ChunkData]], items: list[Any]) -> list[ChunkData]:
+        """执行单类内容提取，出错时记录日志并返回空列表"""
+        if not items:
+            return []
+        try:
+            return extractor(items)
+        except Exception as e:
+            logger.error(f"Error processing content: {e}")
+            return []
+
     def _extract_images(self, pictures: list[PictureItem]) -> list[ChunkData]:
         """提取文档中的图片
 
@@ -142,26 +213,21 @@ class DocxDocumentParser(DocumentParser):
         Returns:
             List[ChunkData]: 图片列表
         """
-        image_items: list[ChunkData] = []
-        for idx, picture in enumerate(pictures):
-            if not picture.image:
-                continue
-            image_uri = str(picture.image.uri)
-            caption = [caption.cref for caption in picture.captions]
-            footnote = [footnote.cref for footnote in picture.footnotes]
-            image_items.append(
-                ChunkData(
-                    type=ChunkType.IMAGE,
-                    name=f"#/pictures/{idx}",
-                    content=ImageDataItem(
-                        uri=image_uri,
-                        caption=caption,
-                        footnote=footnote
-                    )
+        # 编号沿用图片在文档中的原始下标，与 docling 的 self_ref 保持一致
+        image_type = ChunkType.IMAGE
+        return [
+            ChunkData(
+                type=image_type,
+                name=f"#/pictures/{idx}",
+                content=ImageDataItem(
+                    uri=str(image.uri),
+                    caption=[caption.cref for caption in picture.captions],
+                    footnote=[footnote.cref for footnote in picture.footnotes]
                 )
             )
-
-        return image_items
+            for idx, picture in enumerate(pictures)
+            if (image := picture.image)
+        ]
 
     def _extract_tables(self, tables: list[TableItem]) -> list[ChunkData]:
         """提取文档中的表格
@@ -172,27 +238,50 @@ class DocxDocumentParser(DocumentParser):
         Returns:
             List[ChunkData]: 表格列表
         """
-        table_items: list[ChunkData] = []
-        for table in tables:
-            caption = [caption.cref for caption in table.captions]
-            footnote = [footnote.cref for footnote in table.footnotes]
-            grid = [[cell.text if cell.text else '' for cell in row] for row in table.data.grid]
-            table_data = TableDataItem(
-                rows=table.data.num_rows,
-                columns=table.data.num_cols,
-                grid=grid,
-                caption=caption,
-                footnote=footnote
-            )
-            table_items.append(
-                ChunkData(
-                    type=ChunkType.TABLE,
-                    name=f"#/tables/{len(table_items)}",
-                    content=table_data
-                )
+        # 循环外绑定枚举成员与方法，避免逐项查找属性
+        table_type = ChunkType.TABLE
+        extract_table_data = self._extract_table_data
+        return [
+            ChunkData(
+                type=table_type,
+                name=f"#/tables/{idx}",
+                content=extract_table_data(table)
             )
+            for idx, table in enumerate(tables)
+        ]
+
+    def _extract_table_data(self, table: TableItem) -> TableDataItem:
+        """提取单个表格的网格与表头
 
-        return table_items
+        Args:
+            table: 表格
+
+        Returns:
+            TableDataItem: 表格数据
+        """
+        data = table.data
+        # 一次遍历同时收集单元格文本与表头：列头取自首行，行头取自首列
+        grid: list[str] = []
+        append_cell = grid.append
+        row_headers: list[str] = []
+        column_headers: list[str] = []
+        for row_idx, row in enumerate(data.grid):
+            for col_idx, cell in enumerate(row):
+                text = cell.text or ''
+                append_cell(text)
+                if row_idx == 0 and cell.column_header:
+                    column_headers.append(text)
+                if col_idx == 0 and cell.row_header:
+                    row_headers.append(text)
+        return TableDataItem(
+            rows=data.num_rows,
+            columns=data.num_cols,
+            grid=grid,
+            row_headers=row_headers,
+            column_headers=column_headers,
+            caption=[caption.cref for caption in table.captions],
+            footnote=[footnote.cref for footnote in table.footnotes]
+        )
 
     def _extract_title(self, doc_data: DoclingDocument) -> str:
         """提取文档中的标题
@@ -201,12 +290,12 @@ class DocxDocumentParser(DocumentParser):
         Returns:
             str: 标题
         """
-        title = ""
-        for item in doc_data.texts:
-            if hasattr(item, 'label') and item.label == DocItemLabel.TITLE:
-                title = item.text
-                break
-        return title if title else doc_data.name
+        # 取第一个标题，找到后立即停止扫描；找不到或标题为空时使用文档名
+        title = next(
+            (item.text for item in doc_data.texts if getattr(item, 'label', None) == _DocLabel.TITLE),
+            "",
+        )
+        return title or doc_data.name
 
     def _extract_texts(self, texts:list[TitleItem|SectionHeaderItem|ListItem|CodeItem|FormulaItem|TextItem]) -> list[ChunkData]:
         """提取文档中的文本
@@ -217,47 +306,23 @@ class DocxDocumentParser(DocumentParser):
         Returns:
             List[ChunkData]: 文本列表
         """
-        text_items: list[ChunkData] = []
-
-        for item in texts:
-            if not hasattr(item, 'label'):
-                continue
-            if not hasattr(item, 'text') or len(item.text) == 0:
-                continue
-            match item.label:
-                case DocItemLabel.FORMULA:
-                    text_items.append(
-                        ChunkData(
-                            type=ChunkType.FORMULA,
-                            name=f"formula-{len(text_items)}",
-                            content=FormulaDataItem(
-                                text=item.text
-                            )
-                        )
-                    )
-                case _:
-                    text_items.append(
-                        ChunkData(
-                            type=ChunkType.TEXT,
-                            name=f"#/texts/{len(text_items)}",
-                            content=TextDataItem(
-                                text=item.text
-                            )
-                        )
-                    )
-        return text_items
-
-    async def _extract_images_async(self, pictures: list[PictureItem]) -> list[ChunkData]:
-        """异步提取文档中的图片"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._extract_images, pictures)
-
-    async def _extract_tables_async(self, tables: list[TableItem]) -> list[ChunkData]:
-        """异步提取文档中的表格"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._extract_tables, tables)
-
-    async def _extract_texts_async(self, texts: list[TitleItem|SectionHeaderItem|ListItem|CodeItem|FormulaItem|TextItem]) -> list[ChunkData]:
-        """异步提取文档中的文本"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._extract_texts, texts)
+        # 先筛出带标签的非空文本，再按原顺序构建块，公式与普通文本的相对顺序保持不变
+        entries = [
+            (label, text)
+            for item in texts
+            if (label := getattr(item, 'label', None)) is not None and (text := getattr(item, 'text', ''))
+        ]
+        return [
+            ChunkData(
+                type=ChunkType.FORMULA,
+                name=f"formula-{idx}",
+                content=FormulaDataItem(text=text)
+            )
+            if label == _DocLabel.FORMULA else
+            ChunkData(
+                type=ChunkType.TEXT,
+                name=f"#/texts/{idx}",
+                content=TextDataItem(text=text)
+            )
+            for idx, (label, text) in enumerate(entries)
+        ]
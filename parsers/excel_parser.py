@@ -11,6 +11,8 @@ import json
 import logging
 import time
 import warnings
+import zipfile
+from collections.abc import Callable
 from dataclasses import dataclass
 from datetime import date, datetime
 from pathlib import Path
@@ -19,6 +21,7 @@ from typing import Any
 from openpyxl import load_workbook  # type: ignore
 from openpyxl.drawing.image import Image  # type: ignore
 from openpyxl.workbook.workbook import Workbook  # type: ignore
+from openpyxl.worksheet._read_only import ReadOnlyWorksheet  # type: ignore
 from openpyxl.worksheet.worksheet import Worksheet  # type: ignore
 
 from parsers.base_models import (
@@ -41,12 +44,33 @@ TableData = list[list[CellValue]]
 
 logger = logging.getLogger(__name__)
 
+_DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+_DATE_FORMAT = "%Y-%m-%d"
+
+# 流式模式下无法读取图片与合并单元格，检测到这些部件时回退到完整加载
+_DRAWINGS_PREFIX = "xl/drawings/"
+_WORKSHEETS_PREFIX = "xl/worksheets/"
+_MERGE_CELLS_TAG = b"mergeCell"
+_SCAN_CHUNK_SIZE = 1024 * 1024
+
+# 按单元格值的精确类型分派处理函数，常见类型只需一次字典查找
+_CELL_VALUE_HANDLERS: dict[type, Callable[[Any], str]] = {
+    type(None): lambda _: "",
+    str: str,
+    int: str,
+    float: str,
+    bool: str,
+    datetime: lambda value: value.strftime(_DATETIME_FORMAT),  # datetime 转换为 ISO 格式字符串
+    date: lambda value: value.strftime(_DATE_FORMAT),
+}
+
 @dataclass
 class ExcelParseConfig:
     """Excel解析配置类"""
     data_only: bool = True
     keep_vba: bool = False
     default_image_format: str = 'png'
+    streaming: bool = True  # 无图片和合并单元格时以只读模式流式读取单元格
     image_description_placeholder: str = "[待生成]"
 
 
@@ -67,7 +91,6 @@ class ExcelParser(DocumentParser):
         """
         super().__init__()
         self.config: ExcelParseConfig = config or ExcelParseConfig()
-        self.image_index: int = 0
 
     async def parse(self, file_path: Path) -> DocumentData:
         """
@@ -78,7 +101,7 @@ class ExcelParser(DocumentParser):
             DocumentData: 文档数据
         """
         # 获取文件名作为标题（不带扩展名）
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         try:
             # 初始化内容列表和图片列表
@@ -87,9 +110,13 @@ class ExcelParser(DocumentParser):
             workbook = self._load_workbook(file_path)
 
             # 并行处理每个工作表
-            document_data = await self._process_sheets_parallel(workbook, file_path)
+            try:
+                document_data = await self._process_sheets_parallel(workbook, file_path)
+            finally:
+                # 只读模式的工作簿在解析期间一直持有文件句柄
+                workbook.close()
 
-            processing_time = time.time() - start_time
+            processing_time = time.perf_counter() - start_time
             document_data.processing_time = processing_time
             return document_data
         except Exception as e:
@@ -119,6 +146,10 @@ class ExcelParser(DocumentParser):
                     tables.extend(result.get('tables', []))
                     images.extend(result.get('images', []))
 
+            # 各工作表的图片并发提取，合并后再按工作表顺序统一编号，保证编号稳定
+            for image_index, image in enumerate(images):
+                image.name = f"#/pictures/{image_index}"
+
         return DocumentData(
             title=Path(file_path).stem,
             texts=texts,
@@ -162,7 +193,7 @@ class ExcelParser(DocumentParser):
             }
 
         except Exception as e:
-            logger.error(f"Error processing sheet {sheet_name}: {e}")
+            logger.error("Error processing sheet %s: %s", sheet_name, e)
             return None
 
     def _load_workbook(self, excel_path: Path) -> Workbook:
@@ -173,12 +204,39 @@ class ExcelParser(DocumentParser):
         Returns:
             Workbook: 加载的工作簿对象
         """
+        read_only = self.config.streaming and not self._has_layout_parts(excel_path)
         return load_workbook(
             excel_path,
+            read_only=read_only,
             data_only=self.config.data_only,
             keep_vba=self.config.keep_vba
         )
 
+    @staticmethod
+    def _has_layout_parts(excel_path: Path) -> bool:
+        """
+        检查工作簿是否包含只读模式无法读取的图片或合并单元格
+        Args:
+            excel_path: Excel文件路径
+        Returns:
+            bool: 包含图片或合并单元格时返回True
+        """
+        with zipfile.ZipFile(excel_path) as archive:
+            names = archive.namelist()
+            if any(name.startswith(_DRAWINGS_PREFIX) for name in names):
+                return True
+            for name in names:
+                if not (name.startswith(_WORKSHEETS_PREFIX) and name.endswith(".xml")):
+                    continue
+                # 分块扫描工作表 XML，保留少量重叠字节以免标签跨块被截断
+                tail = b""
+                with archive.open(name) as source:
+                    while chunk := source.read(_SCAN_CHUNK_SIZE):
+                        if _MERGE_CELLS_TAG in tail + chunk:
+                            return True
+                        tail = chunk[-len(_MERGE_CELLS_TAG):]
+        return False
+
     def _extract_sheet_images(self, sheet: Worksheet) -> list[ChunkData]:
         """
         提取工作表中的图片
@@ -203,7 +261,7 @@ class ExcelParser(DocumentParser):
                 if image_info:
                     sheet_images.append(image_info)
             except Exception as e:
-                print(f"处理图片失败: {str(e)}")
+                logger.warning("处理图片失败: %s", e)
                 continue
 
         return sheet_images
@@ -217,30 +275,23 @@ class ExcelParser(DocumentParser):
             ChunkData|None: 图片信息，处理失败时返回None
         """
         try:
-            # 获取图片数据
-            img_data = img_obj._data()
-
             # 获取图片格式
             img_format = self._get_image_format(img_obj)
 
-            # 生成Base64编码
-            base64_encoded = base64.b64encode(img_data).decode('utf-8')
+            # 直接对图片数据做Base64编码，不保留原始字节的引用；Base64 只含 ASCII 字符
+            base64_encoded = base64.b64encode(img_obj._data()).decode('ascii')
             uri = f"data:image/{img_format};base64,{base64_encoded}"
 
-            # 创建图片信息
-            image_info = ChunkData(
+            # 创建图片信息，名称在合并所有工作表结果后统一设置
+            return ChunkData(
                 type=ChunkType.IMAGE,
-                name=f"#/pictures/{self.image_index}",
                 content=ImageDataItem(
                     uri=uri
                 )
             )
 
-            self.image_index += 1
-            return image_info
-
         except Exception as e:
-            print(f"处理图片对象失败: {str(e)}")
+            logger.warning("处理图片对象失败: %s", e, exc_info=True)
             return None
 
     def _get_image_format(self, img_obj: Image) -> str:
@@ -268,16 +319,15 @@ class ExcelParser(DocumentParser):
         Returns:
             str: 处理后的单元格值
         """
-        if cell_value is None:
-            return ""
+        handler = _CELL_VALUE_HANDLERS.get(type(cell_value))
+        if handler is not None:
+            return handler(cell_value)
 
-        # 处理datetime对象，转换为ISO格式字符串
+        # 少见的子类型仍按原有规则处理
         if isinstance(cell_value, datetime):
-            return cell_value.strftime("%Y-%m-%d %H:%M:%S")
-
-        # 处理date对象，转换为日期字符串
+            return cell_value.strftime(_DATETIME_FORMAT)
         if isinstance(cell_value, date):
-            return cell_value.strftime("%Y-%m-%d")
+            return cell_value.strftime(_DATE_FORMAT)
 
         # 对于其他类型，转换为字符串
         return str(cell_value)
@@ -290,9 +340,11 @@ class ExcelParser(DocumentParser):
         Returns:
             Dict[str, Any]: 表格数据
         """
+        if isinstance(sheet, ReadOnlyWorksheet):
+            return self._extract_streamed_table_data(sheet)
+
         # 获取合并单元格信息
-        merged_ranges = self._get_merged_cells(sheet)
-        merged_map = self._create_merged_cell_map(merged_ranges, sheet)
+        merged_map = self._create_merged_cell_map(sheet)
 
         # 计算表格维度
         max_row = sheet.max_row
@@ -302,50 +354,73 @@ class ExcelParser(DocumentParser):
         all_rows = self._extract_all_rows(sheet, max_row, max_col, merged_map)
 
         return TableDataItem(
-            rows=len(all_rows),
+            rows=max_row,
             columns=max_col,
             grid=all_rows
         )
 
-    def _get_merged_cells(self, sheet: Worksheet) -> dict[tuple[int, int, int, int], str]:
+    def _extract_streamed_table_data(self, sheet: ReadOnlyWorksheet) -> TableDataItem:
         """
-        获取合并单元格信息
+        以只读模式流式提取表格数据
         Args:
-            sheet: 工作表对象
+            sheet: 只读工作表对象
         Returns:
-            Dict: 合并单元格映射
+            TableDataItem: 表格数据
         """
-        merged_ranges = {}
-        if sheet.merged_cells:
-            for merged_range in sheet.merged_cells.ranges:
-                min_row, min_col, max_row, max_col = (
-                    merged_range.min_row, merged_range.min_col,
-                    merged_range.max_row, merged_range.max_col
-                )
-                merged_value = sheet.cell(row=min_row, column=min_col).value
-                merged_ranges[(min_row, min_col, max_row, max_col)] = merged_value
-        return merged_ranges
+        # 只读模式按 <dimension> 标签确定表格大小，该标签可能过期或缺失；
+        # 清除后逐行读取实际存在的单元格，由读到的行确定行数与列数
+        sheet.reset_dimensions()
+        process_value = self._process_cell_value
+        rows = [
+            list(map(process_value, row))
+            for row in sheet.iter_rows(min_row=1, values_only=True)
+        ]
+        # 与完整加载一致，空工作表视为 1x1
+        max_row = len(rows) or 1
+        max_col = max(map(len, rows), default=0) or 1
+
+        grid: list[str] = []
+        for row in rows:
+            grid.extend(row)
+            # 只读模式产出的各行长度取决于该行最后一个单元格，补齐为空单元格
+            if (missing := max_col - len(row)) > 0:
+                grid.extend([""] * missing)
+        if (missing := max_row * max_col - len(grid)) > 0:
+            grid.extend([""] * missing)
+
+        return TableDataItem(
+            rows=max_row,
+            columns=max_col,
+            grid=grid
+        )
 
-    def _create_merged_cell_map(self, merged_ranges: dict, sheet: Worksheet) -> dict[tuple[int, int], str]:
+    def _create_merged_cell_map(self, sheet: Worksheet) -> dict[int, dict[int, str]]:
         """
         创建合并单元格映射
         Args:
-            merged_ranges: 合并单元格范围
             sheet: 工作表对象
         Returns:
-            Dict: 合并单元格映射
+            Dict: 行号 -> {列号: 合并单元格值}，只包含存在合并单元格的行
         """
-        merged_map = {}
-        for (min_row, min_col, max_row, max_col), value in merged_ranges.items():
-            # 预处理合并单元格的值
-            processed_value = self._process_cell_value(value)
-            for row_idx in range(min_row, max_row + 1):
-                for col_idx in range(min_col, max_col + 1):
-                    merged_map[(row_idx, col_idx)] = processed_value
+        merged_map: dict[int, dict[int, str]] = {}
+        # 只读模式的工作表没有 merged_cells 属性
+        merged_cells = getattr(sheet, 'merged_cells', None)
+        if not merged_cells:
+            return merged_map
+
+        process_value = self._process_cell_value
+        for merged_range in merged_cells.ranges:
+            min_row, min_col = merged_range.min_row, merged_range.min_col
+            # 合并区域取左上角单元格的值，每个区域只预处理一次
+            processed_value = process_value(sheet.cell(row=min_row, column=min_col).value)
+            for row_idx in range(min_row, merged_range.max_row + 1):
+                row_merged = merged_map.setdefault(row_idx, {})
+                for col_idx in range(min_col, merged_range.max_col + 1):
+                    row_merged[col_idx] = processed_value
         return merged_map
 
     def _extract_all_rows(self, sheet: Worksheet, max_row: int, max_col: int,
-                          merged_map: dict[tuple[int, int], str]) -> list[list[str]]:
+                          merged_map: dict[int, dict[int, str]]) -> list[str]:
         """
         提取所有行数据
         Args:
@@ -354,23 +429,25 @@ class ExcelParser(DocumentParser):
             max_col: 最大列数
             merged_map: 合并单元格映射
         Returns:
-            TableData: 所有行数据
+            list[str]: 按行展开的所有单元格数据
         """
-        all_rows = []
-        for row_idx in range(1, max_row + 1):
-            row_data = []
-            for col_idx in range(1, max_col + 1):
-                # 检查是否是合并单元格
-                if (row_idx, col_idx) in merged_map:
-                    cell_value = merged_map[(row_idx, col_idx)]
-                else:
-                    cell = sheet.cell(row=row_idx, column=col_idx)
-                    cell_value = cell.value
-
-                # 预处理单元格值
-                processed_value = self._process_cell_value(cell_value)
-                row_data.append(processed_value)
-            all_rows.append(row_data)
+        all_rows: list[str] = []
+        # 循环内使用局部变量，避免逐单元格查找属性
+        process_value = self._process_cell_value
+        # values_only 直接产出单元格值，不逐个构造 Cell 对象
+        rows = sheet.iter_rows(min_row=1, max_row=max_row, max_col=max_col, values_only=True)
+        for row_idx, row in enumerate(rows, start=1):
+            row_merged = merged_map.get(row_idx)
+            if row_merged is None:
+                # 该行没有合并单元格，无需逐列查表
+                all_rows.extend(map(process_value, row))
+                continue
+            # 合并单元格的值在构建映射时已预处理过
+            all_rows.extend(
+                merged_value if (merged_value := row_merged.get(col_idx)) is not None
+                else process_value(cell_value)
+                for col_idx, cell_value in enumerate(row, start=1)
+            )
 
         return all_rows
 
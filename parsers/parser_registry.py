@@ -4,17 +4,22 @@
 提供基于装饰器的解析器自动注册机制，支持多种文件格式的解析器注册和查找。
 """
 
+import asyncio
 import logging
+import os
 from collections.abc import Callable
 from pathlib import Path
 
-from .base_models import DocumentParser
+from .base_models import DocumentData, DocumentParser
 
 logger = logging.getLogger(__name__)
 
 # 全局解析器注册表
 PARSER_REGISTRY: dict[str, type[DocumentParser]] = {}
 
+# 解析器实例缓存，同一解析器类只创建一个实例
+_INSTANCE_CACHE: dict[type[DocumentParser], DocumentParser] = {}
+
 
 def register_parser(suffixes: list[str]) -> Callable[[type[DocumentParser]], type[DocumentParser]]:
     """
@@ -32,17 +37,18 @@ def register_parser(suffixes: list[str]) -> Callable[[type[DocumentParser]], typ
             ...
     """
     def decorator(cls: type[DocumentParser]) -> type[DocumentParser]:
-        # 验证类是否继承自 DocumentParser
-        if not issubclass(cls, DocumentParser):
+        # 验证类是否继承自 DocumentParser，python -O 下省略
+        if __debug__ and not issubclass(cls, DocumentParser):
             raise TypeError(f"解析器类 {cls.__name__} 必须继承自 DocumentParser")
 
         # 注册到全局注册表
         for suffix in suffixes:
             suffix = suffix.lower()  # 统一转换为小写
             if suffix in PARSER_REGISTRY:
-                logger.warning(f"覆盖已存在的解析器: {suffix} -> {cls.__name__}")
+                logger.warning("覆盖已存在的解析器: %s -> %s", suffix, cls.__name__)
             PARSER_REGISTRY[suffix] = cls
-            logger.info(f"注册解析器: {suffix} -> {cls.__name__}")
+            _INSTANCE_CACHE.pop(cls, None)
+            logger.info("注册解析器: %s -> %s", suffix, cls.__name__)
 
         return cls
 
@@ -51,7 +57,7 @@ def register_parser(suffixes: list[str]) -> Callable[[type[DocumentParser]], typ
 
 def get_parser(file_path: str) -> DocumentParser | None:
     """
-    根据文件路径获取合适的解析器实例
+    根据文件路径获取合适的解析器实例，同一解析器类复用同一个实例
 
     Args:
         file_path: 文件路径
@@ -59,20 +65,94 @@ def get_parser(file_path: str) -> DocumentParser | None:
     Returns:
         解析器实例，如果没有找到则返回 None
     """
-    file = Path(file_path)
-    suffix = file.suffix.lower()
+    # 只对扩展名做大小写转换，无需构造 Path 或转换整条路径
+    suffix = os.path.splitext(file_path)[1].lower()
 
-    if suffix not in PARSER_REGISTRY:
-        logger.warning(f"未找到支持 {suffix} 格式的解析器")
+    parser_class = PARSER_REGISTRY.get(suffix)
+    if parser_class is None:
+        logger.warning("未找到支持 %s 格式的解析器", suffix)
         return None
 
-    parser_class = PARSER_REGISTRY[suffix]
+    return _get_instance(parser_class)
+
+
+def _get_instance(parser_class: type[DocumentParser]) -> DocumentParser | None:
+    """获取解析器类的缓存实例，首次使用时创建"""
+    parser = _INSTANCE_CACHE.get(parser_class)
+    if parser is not None:
+        return parser
+
     try:
-        return parser_class()
+        parser = parser_class()
     except Exception as e:
-        logger.error(f"创建解析器实例失败: {parser_class.__name__}, 错误: {e}")
+        logger.error("创建解析器实例失败: %s, 错误: %s", parser_class.__name__, e)
         return None
 
+    _INSTANCE_CACHE[parser_class] = parser
+    return parser
+
+
+async def warm_up_parsers() -> None:
+    """创建所有已注册解析器的实例并逐个预热，使首个解析请求无需承担模型加载的冷启动开销"""
+    for parser_class in dict.fromkeys(PARSER_REGISTRY.values()):
+        parser = _get_instance(parser_class)
+        if parser is None:
+            continue
+        try:
+            await parser.warm_up()
+        except Exception as e:
+            # 预热失败不影响服务，首次解析时会再次加载
+            logger.warning("解析器预热失败: %s, 错误: %s", parser_class.__name__, e)
+
+async def parse_many(file_paths: list[str], concurrency: int = 8) -> list[DocumentData | BaseException | None]:
+    """
+    并发解析多个文件，同时进行中的解析数量不超过 concurrency
+
+    同一解析器的多个文件优先交给解析器的 parse_batch 一次处理（如PDF在同一次模型推理中完成版面分析），
+    整批失败时再逐个解析，单个文件解析失败不影响其他文件，所有解析都会等待完成后才返回。
+
+    Args:
+        file_paths: 文件路径列表
+        concurrency: 同时进行的解析数上限（一次批量解析计为一个），用于限制转换进程池积压的任务和内存占用
+
+    Returns:
+        与 file_paths 顺序一致的解析结果列表，没有对应解析器的文件为 None，解析失败的文件为对应的异常
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    results: list[DocumentData | BaseException | None] = [None] * len(file_paths)
+
+    # 按解析器实例分组，记录各文件在结果中的位置
+    groups: dict[DocumentParser, list[int]] = {}
+    for index, file_path in enumerate(file_paths):
+        parser = get_parser(file_path)
+        if parser is not None:
+            groups.setdefault(parser, []).append(index)
+
+    async def parse_one(parser: DocumentParser, file_path: Path) -> DocumentData:
+        async with semaphore:
+            return await parser.parse(file_path)
+
+    async def parse_group(parser: DocumentParser, indexes: list[int]) -> None:
+        paths = [Path(file_paths[index]) for index in indexes]
+        group_results: list[DocumentData | BaseException] | None = None
+        parse_batch = getattr(parser, "parse_batch", None)
+        if parse_batch is not None and len(paths) > 1:
+            try:
+                async with semaphore:
+                    group_results = list(await parse_batch(paths))
+            except Exception as e:
+                # 整批失败时逐个重新解析，只让出错的文件失败
+                logger.warning("批量解析失败，改为逐个解析: %s, 错误: %s", type(parser).__name__, e)
+        if group_results is None:
+            group_results = await asyncio.gather(
+                *(parse_one(parser, path) for path in paths), return_exceptions=True
+            )
+        for index, result in zip(indexes, group_results, strict=True):
+            results[index] = result
+
+    await asyncio.gather(*(parse_group(parser, indexes) for parser, indexes in groups.items()))
+    return results
+
 def get_supported_formats() -> list[str]:
     """
     获取所有支持的文件格式
@@ -7,16 +7,20 @@ PDF文档解析器模块
 
 import asyncio
 import base64
+import logging
+import multiprocessing
 import os
 import re
 import shutil
 import time
+import uuid
+from collections.abc import Awaitable, Callable
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Any
 
-import aiofiles  # type: ignore
 from bs4 import BeautifulSoup
-from loguru import logger
 from mineru.backend.pipeline.model_json_to_middle_json import (  # type: ignore
     result_to_middle_json as pipeline_result_to_middle_json,
 )
@@ -30,6 +34,7 @@ from mineru.cli.common import prepare_env, read_fn  # type: ignore
 from mineru.data.data_reader_writer import FileBasedDataWriter  # type: ignore
 from mineru.utils.enum_class import MakeMode  # type: ignore
 
+from config import settings
 from parsers.base_models import (
     ChunkData,
     ChunkType,
@@ -42,6 +47,134 @@ from parsers.base_models import (
 )
 from parsers.parser_registry import register_parser
 
+logger = logging.getLogger(__name__)
+
+# 安装了 pybase64 时使用其 SIMD 实现编码图片，否则回退到标准库
+try:
+    from pybase64 import b64encode as _b64encode  # type: ignore
+except ImportError:
+    _b64encode = base64.b64encode
+
+# 表格单元格内的连续空白压缩为一个空格
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 图片扩展名到 MIME 类型的映射，未知扩展名按 JPEG 处理（MinerU 默认输出 JPEG）
+_MIME_BY_EXT = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+    ".bmp": "image/bmp",
+}
+_DEFAULT_IMAGE_MIME = "image/jpeg"
+
+# 图片分块编码的块大小，必须是 3 的倍数
+_IMAGE_CHUNK_SIZE = 3 * 64 * 1024
+
+# 解析器的默认模型配置，进程池子进程启动时按此配置预加载模型
+_DEFAULT_LANG = "ch"
+_DEFAULT_FORMULA_ENABLE = True
+_DEFAULT_TABLE_ENABLE = True
+
+
+def _init_pdf_worker() -> None:
+    """进程池子进程的初始化函数，在进程启动时加载默认配置的模型"""
+    try:
+        from mineru.backend.pipeline.pipeline_analyze import ModelSingleton
+
+        ModelSingleton().get_model(
+            lang=_DEFAULT_LANG,
+            formula_enable=_DEFAULT_FORMULA_ENABLE,
+            table_enable=_DEFAULT_TABLE_ENABLE,
+        )
+    except Exception as e:
+        # 预加载失败不影响解析，首次解析时会再次加载模型
+        logger.warning("Failed to preload MinerU models: %s", e)
+
+
+# MinerU的版面分析与OCR是CPU密集任务，放到进程池中才能在多个文件间真正并行
+_PDF_EXECUTOR: ProcessPoolExecutor | None = None
+
+
+def _get_pdf_executor() -> ProcessPoolExecutor:
+    """获取PDF解析进程池，首次使用时创建"""
+    global _PDF_EXECUTOR
+    if _PDF_EXECUTOR is None:
+        # 主进程已运行事件循环和线程池，fork 可能复制被其他线程持有的锁，改用 spawn 启动干净的子进程
+        _PDF_EXECUTOR = ProcessPoolExecutor(
+            max_workers=settings.PDF_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_pdf_worker
+        )
+    return _PDF_EXECUTOR
+
+
+async def _run_in_pdf_executor[T](func: Callable[..., T], *args: Any) -> T:
+    """在PDF解析进程池中执行任务
+
+    子进程异常退出（如解析大文件时内存耗尽）会使整个进程池损坏，之后提交的任务都会失败；
+    此时丢弃该进程池，当前任务照常报错，后续任务使用重新创建的进程池。
+    """
+    global _PDF_EXECUTOR
+    executor = _get_pdf_executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(executor, func, *args)
+    except BrokenProcessPool:
+        # 同一进程池上的多个任务会同时失败，只由第一个任务丢弃进程池
+        if _PDF_EXECUTOR is executor:
+            logger.warning("PDF process pool is broken, recreating it for later tasks")
+            _PDF_EXECUTOR = None
+            executor.shutdown(wait=False, cancel_futures=True)
+        raise
+
+
+def _pdf_worker_ready() -> None:
+    """空任务，用于确认进程池子进程已启动并完成模型预加载"""
+
+
+# 图片编码与表格解析共用的线程池，不占用事件循环的默认线程池
+_IO_EXECUTOR: ThreadPoolExecutor | None = None
+
+
+def _get_io_executor() -> ThreadPoolExecutor:
+    """获取图片与表格处理线程池，首次使用时创建"""
+    global _IO_EXECUTOR
+    if _IO_EXECUTOR is None:
+        _IO_EXECUTOR = ThreadPoolExecutor(thread_name_prefix="pdf-io")
+    return _IO_EXECUTOR
+
+
+# 中间图片目录的清理放到单线程中在后台执行，不阻塞事件循环也不会无限增加线程
+_CLEANUP_EXECUTOR: ThreadPoolExecutor | None = None
+
+
+def _get_cleanup_executor() -> ThreadPoolExecutor:
+    """获取目录清理线程池，首次使用时创建"""
+    global _CLEANUP_EXECUTOR
+    if _CLEANUP_EXECUTOR is None:
+        _CLEANUP_EXECUTOR = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pdf-cleanup")
+    return _CLEANUP_EXECUTOR
+
+
+def _remove_dir_in_background(directory: str | os.PathLike[str]) -> None:
+    """在后台删除目录
+
+    先把目录重命名为唯一的名称再删除，同名文件随后的解析重新创建该目录时不会被误删。
+    MinerU 的 prepare_env 返回字符串路径，这里统一转换为 Path。
+    """
+    directory = Path(directory)
+    trash_dir = directory.with_name(f"{directory.name}.{uuid.uuid4().hex}.trash")
+    try:
+        directory.rename(trash_dir)
+    except FileNotFoundError:
+        return
+    except OSError as e:
+        # 清理失败不应影响已经完成的解析结果
+        logger.warning("Failed to remove PDF image directory %s: %s", directory, e)
+        return
+    _get_cleanup_executor().submit(shutil.rmtree, trash_dir, ignore_errors=True)
+
 
 @register_parser(['.pdf'])
 class PdfDocumentParser(DocumentParser):
@@ -54,21 +187,25 @@ class PdfDocumentParser(DocumentParser):
     def __init__(self) -> None:
         """初始化解析器"""
         super().__init__()
-        self.output_dir = Path(__file__).parent.parent / "output"
-        self.lang = "ch"
+        self.output_dir = Path(settings.PDF_OUTPUT_DIR or Path(__file__).parent.parent / "output")
+        self.lang = _DEFAULT_LANG
         self.parse_method = "auto"
-        self.formula_enable = True
-        self.table_enable = True
+        self.formula_enable = _DEFAULT_FORMULA_ENABLE
+        self.table_enable = _DEFAULT_TABLE_ENABLE
+
+    async def warm_up(self) -> None:
+        """启动PDF解析进程池的全部子进程，等待各子进程完成模型预加载"""
+        # 同时提交与进程数相同的空任务，进程池会为每个任务启动一个新的子进程
+        await asyncio.gather(*(_run_in_pdf_executor(_pdf_worker_ready) for _ in range(settings.PDF_WORKERS)))
+        logger.info("PDF parser warmed up with %d worker processes", settings.PDF_WORKERS)
 
     async def parse(self, file_path: Path) -> DocumentData:
-        start_time = time.time()
+        start_time = time.perf_counter()
         try:
             # 执行同步转换（在异步中运行）
             pdf_file_name = file_path.stem
             local_image_dir, _ = prepare_env(self.output_dir, pdf_file_name, self.parse_method)
-            loop = asyncio.get_event_loop()
-            content_list = await loop.run_in_executor(
-                None,
+            content_list = await _run_in_pdf_executor(
                 self._parse_pdf_to_content_list,
                 file_path, local_image_dir, self.lang, self.parse_method, self.formula_enable, self.table_enable
             )
@@ -76,36 +213,80 @@ class PdfDocumentParser(DocumentParser):
             # 执行并行处理
             document_data = await self._process_content_parallel(file_path, content_list)
 
-            shutil.rmtree(local_image_dir, ignore_errors=True)
-            processing_time = time.time() - start_time
+            _remove_dir_in_background(local_image_dir)
+            processing_time = time.perf_counter() - start_time
             document_data.processing_time = processing_time
-            logger.info(f"Successfully parsed DOCX: {file_path} (took {processing_time:.2f}s)")
+            logger.info("Successfully parsed PDF: %s (took %.2fs)", file_path, processing_time)
             return document_data
 
         except Exception as e:
             raise Exception(f"Failed to parse PDF file {file_path}: {type(e).__name__}: {e}") from e
 
+    async def parse_batch(self, file_paths: list[Path]) -> list[DocumentData]:
+        """批量解析多个PDF文件
+
+        所有文件在同一次模型推理中完成版面分析，比逐个调用 parse 更能利用GPU批处理能力。
+
+        Args:
+            file_paths: PDF文件路径列表
+
+        Returns:
+            list[DocumentData]: 与 file_paths 顺序一致的解析结果，processing_time 为整批耗时
+        """
+        if not file_paths:
+            return []
+        start_time = time.perf_counter()
+        local_image_dirs = [
+            prepare_env(self.output_dir, file_path.stem, self.parse_method)[0] for file_path in file_paths
+        ]
+        try:
+            content_lists = await _run_in_pdf_executor(
+                self._parse_pdfs_to_content_lists,
+                file_paths, local_image_dirs, self.lang, self.parse_method, self.formula_enable, self.table_enable
+            )
+            documents = await asyncio.gather(*(
+                self._process_content_parallel(file_path, content_list)
+                for file_path, content_list in zip(file_paths, content_lists, strict=True)
+            ))
+        except Exception as e:
+            raise Exception(f"Failed to parse PDF batch of {len(file_paths)} files: {type(e).__name__}: {e}") from e
+        finally:
+            for local_image_dir in local_image_dirs:
+                _remove_dir_in_background(local_image_dir)
+
+        processing_time = time.perf_counter() - start_time
+        for document_data in documents:
+            document_data.processing_time = processing_time
+        logger.info("Successfully parsed %d PDFs (took %.2fs)", len(file_paths), processing_time)
+        return list(documents)
+
     async def _process_content_parallel(self, file_path: Path, content_list: list[dict[str, Any]]) -> DocumentData:
-        # 创建任务列表
-        tasks = []
+        # 创建任务列表，只有图片读取与表格解析需要并发执行
+        tasks: list[Awaitable[ChunkData | None]] = []
         title = file_path.stem
         texts_chunks: list[ChunkData] = []
         tables_chunks: list[ChunkData] = []
         images_chunks: list[ChunkData] = []
         formulas_chunks: list[ChunkData] = []
+        # 事件循环与线程池每个文档只获取一次
+        loop = asyncio.get_running_loop()
+        io_executor = _get_io_executor()
 
         for idx, item in enumerate(content_list):
             if item["type"] == "image":
-                tasks.append(self._process_image(idx, item))
+                tasks.append(self._process_image(idx, item, loop))
             elif item["type"] == "table":
-                tasks.append(self._process_table_async(idx, item))
+                tasks.append(loop.run_in_executor(io_executor, self._process_table, idx, item))
             elif item["type"] == "equation":
-                tasks.append(self._process_formula_async(idx, item))
+                # 文本与公式只是构造对象，直接同步处理，省去提交线程池的开销
+                if (formula := self._process_formula(idx, item)) is not None:
+                    formulas_chunks.append(formula)
             elif item["type"] == "text":
                 if item.get("text_level") == 1:
                     title = item.get("text", "")
                     continue
-                tasks.append(self._process_text_async(idx, item))
+                if (text := self._process_text(idx, item)) is not None:
+                    texts_chunks.append(text)
 
         # 并行执行所有任务
         if tasks:
@@ -120,10 +301,6 @@ class PdfDocumentParser(DocumentParser):
                     images_chunks.append(result)
                 elif result.type == ChunkType.TABLE:
                     tables_chunks.append(result)
-                elif result.type == ChunkType.FORMULA:
-                    formulas_chunks.append(result)
-                elif result.type == ChunkType.TEXT:
-                    texts_chunks.append(result)
         return DocumentData(
                 title=title,
                 texts=texts_chunks,
@@ -133,8 +310,8 @@ class PdfDocumentParser(DocumentParser):
                 success=True
             )
 
+    @staticmethod
     def _parse_pdf_to_content_list(
-        self,
         file_path: Path,
         local_image_dir: Path,
         lang: str = "ch",
@@ -142,152 +319,144 @@ class PdfDocumentParser(DocumentParser):
         formula_enable: bool = True,
         table_enable: bool = True,
     ) -> list[dict[str, Any]]:
+        return PdfDocumentParser._parse_pdfs_to_content_lists(
+            [file_path], [local_image_dir], lang, parse_method, formula_enable, table_enable
+        )[0]
+
+    @staticmethod
+    def _parse_pdfs_to_content_lists(
+        file_paths: list[Path],
+        local_image_dirs: list[Path],
+        lang: str = "ch",
+        parse_method: str = "auto",
+        formula_enable: bool = True,
+        table_enable: bool = True,
+    ) -> list[list[dict[str, Any]]]:
+        """在一次 pipeline_doc_analyze 调用中批量分析多个PDF，再逐个生成 content_list"""
 
         # 1. 读取 PDF bytes
-        try:
-            pdf_bytes = read_fn(file_path)
-        except Exception as e:
-            logger.error(f"Failed to read PDF file {file_path}: {e}")
-            raise
-
-        image_writer = FileBasedDataWriter(local_image_dir)
-
-        # 4. 执行 pipeline 解析
+        pdf_bytes_list = []
+        for file_path in file_paths:
+            try:
+                pdf_bytes_list.append(read_fn(file_path))
+            except Exception:
+                logger.exception("Failed to read PDF file %s", file_path)
+                raise
+
+        # 4. 执行 pipeline 解析，整批文档共享一次模型推理
         try:
             infer_results, all_image_lists, all_pdf_docs, lang_list, ocr_enabled_list = pipeline_doc_analyze(
-                [pdf_bytes], [lang], parse_method=parse_method,
+                pdf_bytes_list, [lang] * len(pdf_bytes_list), parse_method=parse_method,
                 formula_enable=formula_enable, table_enable=table_enable
             )
-            model_list = infer_results[0]
-            images_list = all_image_lists[0]
-            pdf_doc = all_pdf_docs[0]
-            _lang = lang_list[0]
-            _ocr_enable = ocr_enabled_list[0]
-        except Exception as e:
-            logger.error(f"Failed in pipeline_doc_analyze: {e}")
+        except Exception:
+            logger.exception("Failed in pipeline_doc_analyze")
             raise
 
-        # 5. 生成 middle_json
-        try:
-            middle_json = pipeline_result_to_middle_json(
-                model_list, images_list, pdf_doc, image_writer, _lang, _ocr_enable, formula_enable
-            )
-            pdf_info = middle_json["pdf_info"]
-        except Exception as e:
-            logger.error(f"Failed in pipeline_result_to_middle_json: {e}")
-            raise
+        content_lists: list[list[dict[str, Any]]] = []
+        for idx, local_image_dir in enumerate(local_image_dirs):
+            image_writer = FileBasedDataWriter(local_image_dir)
 
-        # 6. 生成 content_list（不写入文件）
-        try:
-            content_list = pipeline_union_make(pdf_info, MakeMode.CONTENT_LIST, str(local_image_dir))
-        except Exception as e:
-            logger.error(f"Failed in pipeline_union_make: {e}")
-            raise
-        return list(content_list)
-
-    async def _process_image(self, idx:int,image:dict[str, Any]) -> ChunkData|None:
+            # 5. 生成 middle_json
+            try:
+                middle_json = pipeline_result_to_middle_json(
+                    infer_results[idx], all_image_lists[idx], all_pdf_docs[idx], image_writer,
+                    lang_list[idx], ocr_enabled_list[idx], formula_enable
+                )
+                pdf_info = middle_json["pdf_info"]
+            except Exception:
+                logger.exception("Failed in pipeline_result_to_middle_json")
+                raise
+
+            # 6. 生成 content_list（不写入文件），union_make 返回的已是列表，无需再复制
+            try:
+                content_list = pipeline_union_make(pdf_info, MakeMode.CONTENT_LIST, str(local_image_dir))
+            except Exception:
+                logger.exception("Failed in pipeline_union_make")
+                raise
+            content_lists.append(content_list)
+        return content_lists
+
+    async def _process_image(
+        self, idx:int, image:dict[str, Any], loop: asyncio.AbstractEventLoop|None = None
+    ) -> ChunkData|None:
         if not image.get("img_path") or not os.path.exists(str(image.get("img_path"))):
             return None
         image_path = Path(str(image.get("img_path")))
 
-        async with aiofiles.open(image_path, 'rb') as img_file:
-            img_data = await img_file.read()
-
-            base64_data = base64.b64encode(img_data).decode("utf-8")
-            ext = os.path.splitext(image_path.name)[1].lower()
-            mime_type = "image/jpeg"
-            if ext == ".png":
-                mime_type = "image/png"
-            elif ext == ".gif":
-                mime_type = "image/gif"
-
-            return ChunkData(
-                type=ChunkType.IMAGE,
-                name=f"#/pictures/{idx}",
-                content=ImageDataItem(
-                    uri=f"data:{mime_type};base64,{base64_data}",
-                    caption=image.get("img_caption", []),
-                    footnote=image.get("img_footnote", [])
-                )
-            )
-
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        base64_data = await loop.run_in_executor(_get_io_executor(), self._encode_image_file, image_path)
+        mime_type = _MIME_BY_EXT.get(image_path.suffix.lower(), _DEFAULT_IMAGE_MIME)
+        uri = f"data:{mime_type};base64,{base64_data}"
 
-    async def _process_table_async(self, idx:int, table:dict[str, Any]) -> ChunkData|None:
-        """异步处理表格（在线程池中执行）"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._process_table, idx, table)
-
-    async def _process_formula_async(self, idx:int, formula:dict[str, Any]) -> ChunkData|None:
-        """异步处理公式（在线程池中执行）"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._process_formula, idx, formula)
+        return ChunkData(
+            type=ChunkType.IMAGE,
+            name=f"#/pictures/{idx}",
+            content=ImageDataItem(
+                uri=uri,
+                caption=image.get("img_caption", []),
+                footnote=image.get("img_footnote", [])
+            )
+        )
 
-    async def _process_text_async(self, idx:int, text:dict[str, Any]) -> ChunkData|None:
-        """异步处理文本（在线程池中执行）"""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(None, self._process_text, idx, text)
+    @staticmethod
+    def _encode_image_file(image_path: Path) -> str:
+        """分块读取图片并编码为Base64，不在内存中保留完整的原始字节"""
+        encoded = bytearray()
+        with open(image_path, 'rb') as img_file:
+            # 块大小是 3 的倍数，各块独立编码后直接拼接不会产生填充字符
+            while chunk := img_file.read(_IMAGE_CHUNK_SIZE):
+                encoded += _b64encode(chunk)
+        # Base64 只含 ASCII 字符
+        return encoded.decode("ascii")
 
     def _process_table(self, idx:int,table:dict[str, Any]) -> ChunkData|None:
         """同步处理表格"""
         html_str = table.get("table_body", "")
-        soup = BeautifulSoup(html_str, 'html.parser')
+        # lxml 解析器由 C 实现，比纯 Python 的 html.parser 快得多
+        soup = BeautifulSoup(html_str, 'lxml')
         table_body = soup.find('table')
         if not table_body:
             return None
-        # 使用网格处理 rowspan 和 colspan
-        grid: list[list[str]] = []
-        max_col = 0
-
+        # 第一遍：确定每个单元格在网格中的位置，已被上方 rowspan 占据的位置会被跳过
+        occupied: set[tuple[int, int]] = set()
+        placements: list[tuple[int, int, int, int, str]] = []
+        num_rows = 0
+        num_cols = 0
         for row_idx, tr in enumerate(table_body.find_all('tr')): # type: ignore
-            while len(grid) <= row_idx:
-                grid.append([])
-            current_row: list[str] = grid[row_idx]
+            num_rows = max(num_rows, row_idx + 1)
             col_idx = 0
-
-            # 跳过被 rowspan 占据的位置
-            while col_idx < len(current_row) and current_row[col_idx] is not None:
-                col_idx += 1
-
             for cell in tr.find_all(['td', 'th']):
-                text = ''.join(cell.stripped_strings)
-                text = re.sub(r'\s+', ' ', text).strip()
-                if not text:
-                    text = ""
-
+                text = _WHITESPACE_RE.sub(' ', ''.join(cell.stripped_strings)).strip()
                 rowspan = int(cell.get('rowspan', 1))
                 colspan = int(cell.get('colspan', 1))
 
                 # 找到下一个空位
-                while col_idx < len(current_row) and current_row[col_idx] is not None:
+                while (row_idx, col_idx) in occupied:
                     col_idx += 1
-
-                # 扩展行
-                while len(current_row) < col_idx + colspan:
-                    current_row.append("")
-
-                # 填入内容
-                for r in range(rowspan):
-                    actual_row_idx = row_idx + r
-                    while len(grid) <= actual_row_idx:
-                        grid.append([])
-                    actual_row = grid[actual_row_idx]
-                    while len(actual_row) < col_idx + colspan:
-                        actual_row.append("")
-                    for c in range(colspan):
-                        actual_row[col_idx + c] = text
+                placements.append((row_idx, col_idx, rowspan, colspan, text))
+                occupied.update(
+                    (r, c)
+                    for r in range(row_idx, row_idx + rowspan)
+                    for c in range(col_idx, col_idx + colspan)
+                )
 
                 col_idx += colspan
+                num_rows = max(num_rows, row_idx + rowspan)
+                num_cols = max(num_cols, col_idx)
 
-            max_col = max(max_col, len(current_row))
+        # 第二遍：按最终尺寸一次性分配扁平网格，再按行切片填入合并单元格的内容
+        grid = [""] * (num_rows * num_cols)
+        for row_idx, col_idx, rowspan, colspan, text in placements:
+            for r in range(row_idx, row_idx + rowspan):
+                offset = r * num_cols + col_idx
+                grid[offset:offset + colspan] = [text] * colspan
 
-        # 确保所有行长度一致
-        for row in grid:
-            while len(row) < max_col:
-                row.append("")
         # 5. 创建并返回 TableDataItem 实例
         table_data = TableDataItem(
-            rows=len(grid),
-            columns=max_col,
+            rows=num_rows,
+            columns=num_cols,
             grid=grid,
             caption=table.get("table_caption", []),
             footnote=table.get("table_footnote", [])
@@ -1,8 +1,8 @@
 # storage/redis_client.py
-import json
 import logging
 from typing import Any
 
+import orjson
 import redis.asyncio as redis
 
 logger = logging.getLogger(__name__)
@@ -26,28 +26,79 @@ class TaskManager:
         self.redis = redis_client
         self.queue_name = queue_name
         self.status_prefix = status_prefix
+        # 首次批量获取任务时探测服务端是否支持 BLMPOP（Redis 7.0+）
+        self._blmpop_supported = True
 
     async def push_task(self, task_data: dict[str, Any]) -> bool:
         """推送任务到队列"""
         try:
-            await self.redis.rpush(self.queue_name, json.dumps(task_data)) # type: ignore
+            await self.redis.rpush(self.queue_name, orjson.dumps(task_data)) # type: ignore
             logger.info(f"任务已推送到队列: {task_data.get('task_id')}")
             return True
         except Exception as e:
             logger.error(f"推送任务失败: {e}")
             return False
 
+    async def submit_task(self, task_data: dict[str, Any], status: str = "pending", timeout: int = 3600) -> bool:
+        """设置任务初始状态并推送到队列，两条命令在同一事务中一次往返完成"""
+        try:
+            task_id = task_data.get("task_id")
+            # 先写状态再入队，且二者原子执行，worker 取到任务时状态一定已存在
+            async with self.redis.pipeline(transaction=True) as pipe:
+                pipe.setex(f"{self.status_prefix}:{task_id}", timeout, status)
+                pipe.rpush(self.queue_name, orjson.dumps(task_data))
+                await pipe.execute()
+            logger.info(f"任务已推送到队列: {task_id}")
+            return True
+        except Exception as e:
+            logger.error(f"提交任务失败: {e}")
+            return False
+
     async def get_task(self) -> Any:
         """从队列获取任务"""
         try:
             task_data = await self.redis.blpop([self.queue_name], timeout=1) # type: ignore
             if task_data:
-                return json.loads(task_data[1])
+                return orjson.loads(task_data[1])
             return None
         except Exception as e:
             logger.error(f"获取任务失败: {e}")
             return None
 
+    async def get_tasks(self, count: int = 8) -> list[Any]:
+        """从队列批量获取任务，最多等待1秒，一次往返最多取出 count 个任务
+
+        Redis 7.0+ 使用 BLMPOP 命令；更早的版本没有该命令，回退为 BLPOP 等待第一个任务，
+        再在同一个管道中用 LPOP 取出其余任务。
+        """
+        try:
+            if self._blmpop_supported:
+                try:
+                    # BLMPOP 返回 [队列名, [元素...]]，超时返回 None
+                    popped: Any = await self.redis.blmpop(1, 1, self.queue_name, direction="LEFT", count=count)
+                except redis.ResponseError as e:
+                    if "unknown command" not in str(e).lower():
+                        raise
+                    logger.warning("Redis 不支持 BLMPOP，批量获取任务回退为 BLPOP + LPOP")
+                    self._blmpop_supported = False
+                else:
+                    return [orjson.loads(task) for task in popped[1]] if popped else []
+
+            first: Any = await self.redis.blpop([self.queue_name], timeout=1)
+            if not first:
+                return []
+            raw_tasks = [first[1]]
+            if count > 1:
+                # Redis 6.2 之前的 LPOP 不支持 count 参数，逐个弹出但只需一次往返
+                async with self.redis.pipeline(transaction=False) as pipe:
+                    for _ in range(count - 1):
+                        pipe.lpop(self.queue_name)
+                    raw_tasks.extend(task for task in await pipe.execute() if task is not None)
+            return [orjson.loads(task) for task in raw_tasks]
+        except Exception as e:
+            logger.error(f"批量获取任务失败: {e}")
+            return []
+
     async def set_task_status(self, task_id: str, status: str, timeout: int = 3600) -> bool:
         """设置任务状态"""
         try:
@@ -70,13 +121,17 @@ class TaskManager:
     async def update_task_status(self, task_id: str, status: str, result: dict | None = None) -> bool:
         """更新任务状态和结果"""
         try:
-            # 更新状态
-            await self.set_task_status(task_id, status)
+            # 状态与结果在同一个管道中发送，只需一次网络往返
+            async with self.redis.pipeline(transaction=False) as pipe:
+                # 更新状态
+                pipe.setex(f"{self.status_prefix}:{task_id}", 3600, status)
 
-            # 如果有结果，存储结果
-            if result:
-                result_key = f"task_result:{task_id}"
-                await self.redis.setex(result_key, 86400, json.dumps(result))  # 24小时过期
+                # 如果有结果，存储结果
+                if result:
+                    result_key = f"task_result:{task_id}"
+                    # orjson 直接生成 bytes，无需再构造中间的 str
+                    pipe.setex(result_key, 86400, orjson.dumps(result))  # 24小时过期
+                await pipe.execute()
 
             return True
         except Exception as e:
@@ -89,7 +144,7 @@ class TaskManager:
             result_key = f"task_result:{task_id}"
             result_data = await self.redis.get(result_key)
             if result_data:
-                return json.loads(result_data)
+                return orjson.loads(result_data)
             return None
         except Exception as e:
             logger.error(f"获取任务结果失败: {e}")
@@ -1,11 +1,26 @@
+import asyncio
+import functools
+import hashlib
+import hmac
+import io
+import itertools
+import logging
+import os
+import re
+import time
 import urllib.parse
-from contextlib import AsyncExitStack
-from datetime import timedelta
+from collections import OrderedDict
+from collections.abc import Iterable
+from contextlib import AsyncExitStack, suppress
+from datetime import UTC, datetime, timedelta
 from io import BytesIO
-from typing import Any, Protocol, Self, runtime_checkable
+from typing import Any, BinaryIO, Protocol, Self, runtime_checkable
 
+from aiobotocore.config import AioConfig  # type: ignore
 from aiobotocore.session import AioSession  # type: ignore
 
+logger = logging.getLogger(__name__)
+
 
 # ruff: noqa: N803
 @runtime_checkable
@@ -15,7 +30,7 @@ class S3ClientProtocol(Protocol):
         *,
         Bucket: str | None,
         Key: str,
-        Body: BytesIO,
+        Body: bytes | BinaryIO,
         ContentType: str
     ) -> dict[str, Any]: ...
 
@@ -26,6 +41,54 @@ class S3ClientProtocol(Protocol):
         Key: str
     ) -> dict[str, Any]: ...
 
+    async def create_multipart_upload(
+        self,
+        *,
+        Bucket: str | None,
+        Key: str,
+        ContentType: str
+    ) -> dict[str, Any]: ...
+
+    async def upload_part(
+        self,
+        *,
+        Bucket: str | None,
+        Key: str,
+        UploadId: str,
+        PartNumber: int,
+        Body: bytes
+    ) -> dict[str, Any]: ...
+
+    async def complete_multipart_upload(
+        self,
+        *,
+        Bucket: str | None,
+        Key: str,
+        UploadId: str,
+        MultipartUpload: dict[str, list[dict[str, Any]]]
+    ) -> dict[str, Any]: ...
+
+    async def abort_multipart_upload(
+        self,
+        *,
+        Bucket: str | None,
+        Key: str,
+        UploadId: str
+    ) -> dict[str, Any]: ...
+
+    async def delete_objects(
+        self,
+        *,
+        Bucket: str | None,
+        Delete: dict[str, Any]
+    ) -> dict[str, Any]: ...
+
+    async def head_bucket(
+        self,
+        *,
+        Bucket: str
+    ) -> dict[str, Any]: ...
+
     async def generate_presigned_url(
         self,
         ClientMethod: str,
@@ -44,20 +107,126 @@ class S3Error(Exception):
     """S3操作异常"""
     pass
 
+# 连接池中空闲连接的保活时间与 DNS 缓存时间（秒），复用连接以省去重复的 TCP/TLS 握手
+_KEEPALIVE_TIMEOUT = 75
+_DNS_CACHE_TTL = 300
+# 建立连接与读取响应的超时（秒），以及限流时的自适应重试策略
+_CONNECT_TIMEOUT = 5
+_READ_TIMEOUT = 60
+_RETRIES = {"mode": "adaptive", "max_attempts": 5}
+
+# 超过阈值的文件分片上传，内存中最多同时持有 并发数 × 分片大小 的数据
+_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+_MULTIPART_CHUNK_SIZE = 8 * 1024 * 1024
+_MULTIPART_CONCURRENCY = 8
+
+# 单次 DeleteObjects 请求最多可删除的对象数
+_DELETE_BATCH_SIZE = 1000
+
+# 只含URL非保留字符的文件名编码后不变，可以跳过编码
+_URL_SAFE_RE = re.compile(r'[A-Za-z0-9._~-]+')
+
+# 流式下载时每次从响应体读取的字节数
+_DOWNLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+
+_CONTENT_TYPE = "application/octet-stream"
+
+# 预签名URL按小时缓存，同一小时内对同一对象重复签名直接复用，返回的URL有效期最多比请求的少一小时
+_URL_CACHE_PERIOD = 3600
+_URL_CACHE_SIZE = 4096
+
+
+def _remaining_size(content: BinaryIO) -> int | None:
+    """返回文件对象从当前位置到末尾的字节数，不可定位的流返回 None"""
+    try:
+        position = content.tell()
+        end = content.seek(0, os.SEEK_END)
+        content.seek(position)
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return None
+    return end - position
+
+
+class _SigV4Presigner:
+    """在本地计算 S3 GET 对象的 SigV4 预签名URL（路径风格）
+
+    签名只涉及 HMAC 计算，不需要走 botocore 的端点解析流程；派生的签名密钥按日期缓存。
+    """
+
+    def __init__(self, endpoint_url: str, access_key: str, secret_key: str, region: str) -> None:
+        parts = urllib.parse.urlsplit(endpoint_url)
+        # 与 botocore 一致，Host 头省略协议的默认端口
+        host = parts.netloc
+        default_port = {"http": ":80", "https": ":443"}.get(parts.scheme)
+        if default_port and host.endswith(default_port):
+            host = host.removesuffix(default_port)
+        self._base_url = f"{parts.scheme}://{parts.netloc}"
+        self._host = host
+        self._access_key = access_key
+        self._secret_key = secret_key
+        self._region = region
+        self._signing_date = ""
+        self._signing_key = b""
+
+    @staticmethod
+    def supports(endpoint_url: str) -> bool:
+        """只处理不带路径前缀的 http(s) 端点，其余情况交给 botocore"""
+        parts = urllib.parse.urlsplit(endpoint_url)
+        return parts.scheme in ("http", "https") and parts.path in ("", "/") and not parts.query
+
+    def _get_signing_key(self, date: str) -> bytes:
+        if date != self._signing_date:
+            key = ("AWS4" + self._secret_key).encode()
+            for part in (date, self._region, "s3", "aws4_request"):
+                key = hmac.new(key, part.encode(), hashlib.sha256).digest()
+            self._signing_key = key
+            self._signing_date = date
+        return self._signing_key
+
+    def presign(self, bucket: str, key: str, expires_in: int, now: datetime | None = None) -> str:
+        """生成 GET 对象的预签名URL"""
+        amz_date = (now or datetime.now(UTC)).strftime("%Y%m%dT%H%M%SZ")
+        date = amz_date[:8]
+        scope = f"{date}/{self._region}/s3/aws4_request"
+        path = f"/{urllib.parse.quote(bucket, safe='')}/{urllib.parse.quote(key, safe='/~')}"
+        # 查询参数按名称排序后即为规范查询串
+        query = urllib.parse.urlencode({
+            "X-Amz-Algorithm": "AWS4-HMAC-SHA256",
+            "X-Amz-Credential": f"{self._access_key}/{scope}",
+            "X-Amz-Date": amz_date,
+            "X-Amz-Expires": str(expires_in),
+            "X-Amz-SignedHeaders": "host",
+        }, safe="~", quote_via=urllib.parse.quote)
+        canonical_request = f"GET\n{path}\n{query}\nhost:{self._host}\n\nhost\nUNSIGNED-PAYLOAD"
+        string_to_sign = (
+            f"AWS4-HMAC-SHA256\n{amz_date}\n{scope}\n"
+            f"{hashlib.sha256(canonical_request.encode()).hexdigest()}"
+        )
+        signature = hmac.new(self._get_signing_key(date), string_to_sign.encode(), hashlib.sha256).hexdigest()
+        return f"{self._base_url}{path}?{query}&X-Amz-Signature={signature}"
+
+
 class AsyncS3Client:
     def __init__(self,
                  endpoint_url: str | None,
                  access_key: str | None,
                  secret_key: str | None,
                  bucket: str | None,
-                 region: str = "us-east-1") -> None:
+                 region: str = "us-east-1",
+                 max_pool_connections: int = 64) -> None:
         self.endpoint_url = endpoint_url
         self.access_key = access_key
         self.secret_key = secret_key
         self.bucket = bucket
         self.region = region
+        self.max_pool_connections = max_pool_connections
         self._stack = AsyncExitStack()
         self._client: S3ClientProtocol | None = None
+        # (key, 有效天数) -> 预签名URL，只保存当前小时内生成的URL
+        self._url_cache: OrderedDict[tuple[str, int], str] = OrderedDict()
+        self._url_cache_period = 0
+        self._presigner: _SigV4Presigner | None = None
+        self._warmup_task: asyncio.Task[None] | None = None
 
     async def __aenter__(self) -> Self:
         session = AioSession()
@@ -68,33 +237,152 @@ class AsyncS3Client:
                 aws_access_key_id=self.access_key,
                 aws_secret_access_key=self.secret_key,
                 region_name=self.region,
+                config=AioConfig(
+                    max_pool_connections=self.max_pool_connections,
+                    connect_timeout=_CONNECT_TIMEOUT,
+                    read_timeout=_READ_TIMEOUT,
+                    tcp_keepalive=True,
+                    retries=_RETRIES,
+                    # 预签名同样使用 SigV4，与本地签名生成的URL格式一致
+                    signature_version="s3v4",
+                    connector_args={
+                        "keepalive_timeout": _KEEPALIVE_TIMEOUT,
+                        "ttl_dns_cache": _DNS_CACHE_TTL,
+                    },
+                ),
             )
         )
+        if self.endpoint_url and self.access_key and self.secret_key \
+                and _SigV4Presigner.supports(self.endpoint_url):
+            self._presigner = _SigV4Presigner(self.endpoint_url, self.access_key, self.secret_key, self.region)
+        # 后台发起一次 HeadBucket，提前完成 DNS 解析与 TCP/TLS 握手，首个上传直接复用连接
+        if self.bucket:
+            self._warmup_task = asyncio.create_task(self._warm_up(self.bucket))
         return self
 
     async def __aexit__(self, *_: object) -> None:
+        if self._warmup_task is not None:
+            # 等待预热任务真正结束，再关闭客户端，避免其在已关闭的连接上收尾
+            self._warmup_task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._warmup_task
+            self._warmup_task = None
         await self._stack.aclose()
 
-    def _encode_filename(self, filename: str) -> str:
+    async def _warm_up(self, bucket: str) -> None:
+        """预热连接池，失败时只记录日志，不影响后续请求"""
+        if self._client is None:
+            return
+        try:
+            await self._client.head_bucket(Bucket=bucket)
+        except Exception as e:
+            logger.warning("S3 connection warm-up failed: %s", e)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def _encode_filename(filename: str) -> str:
         """对文件名进行URL编码，确保S3 key的安全性"""
+        if _URL_SAFE_RE.fullmatch(filename):
+            return filename
         return urllib.parse.quote(filename, safe='')
 
-    async def upload_file(self, filename: str, content: bytes) -> str:
-        """上传文件，使用编码后的文件名作为key"""
+    async def upload_file(self, filename: str, content: bytes | BinaryIO) -> str:
+        """上传文件，使用编码后的文件名作为key
+
+        content 可以是字节串，也可以是以二进制模式打开的文件对象；
+        传入文件对象时由 botocore 分块读取上传，无需先把整个文件读入内存。
+        超过 _MULTIPART_THRESHOLD 的内容按分片并发上传。
+        """
         if self._client is None:
             raise S3ClientNotInitializedError
 
         # 对文件名进行编码
         encoded_key = self._encode_filename(filename)
 
-        await self._client.put_object(
-            Bucket=self.bucket,
-            Key=encoded_key,
-            Body=BytesIO(content),
-            ContentType="application/octet-stream"
-        )
+        size = len(content) if isinstance(content, bytes) else _remaining_size(content)
+        if size is not None and size > _MULTIPART_THRESHOLD:
+            # 分片上传需要按块读取，BytesIO 与原字节串共享内存，不会复制内容
+            await self._multipart_upload(
+                encoded_key, BytesIO(content) if isinstance(content, bytes) else content
+            )
+        else:
+            # 字节串与文件对象都可以直接作为请求体，无需再包装
+            await self._client.put_object(
+                Bucket=self.bucket,
+                Key=encoded_key,
+                Body=content,
+                ContentType=_CONTENT_TYPE
+            )
         return await self.generate_presigned_url(encoded_key)
 
+    async def upload_files(
+        self,
+        files: Iterable[tuple[str, bytes | BinaryIO]],
+        concurrency: int | None = None
+    ) -> list[str]:
+        """并发上传多个文件
+
+        Args:
+            files: (文件名, 内容) 序列
+            concurrency: 同时进行的上传数上限，默认与连接池大小一致，避免连接池耗尽
+
+        Returns:
+            list[str]: 与 files 顺序一致的预签名URL
+        """
+        semaphore = asyncio.Semaphore(concurrency or self.max_pool_connections)
+
+        async def upload_one(filename: str, content: bytes | BinaryIO) -> str:
+            async with semaphore:
+                return await self.upload_file(filename, content)
+
+        return list(await asyncio.gather(*(upload_one(filename, content) for filename, content in files)))
+
+    async def _multipart_upload(self, key: str, body: BinaryIO) -> None:
+        """分片上传，边读取边上传，同时进行中的分片数不超过 _MULTIPART_CONCURRENCY"""
+        client = self._client
+        if client is None:
+            raise S3ClientNotInitializedError
+
+        upload = await client.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType=_CONTENT_TYPE)
+        upload_id = upload["UploadId"]
+        # 读取下一个分片前先占用名额，限制内存中待上传的分片数量
+        slots = asyncio.Semaphore(_MULTIPART_CONCURRENCY)
+
+        async def upload_part(part_number: int, data: bytes) -> dict[str, Any]:
+            try:
+                response = await client.upload_part(
+                    Bucket=self.bucket,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=part_number,
+                    Body=data
+                )
+            finally:
+                slots.release()
+            return {"ETag": response["ETag"], "PartNumber": part_number}
+
+        tasks: list[asyncio.Task[dict[str, Any]]] = []
+        try:
+            while True:
+                await slots.acquire()
+                data = body.read(_MULTIPART_CHUNK_SIZE)
+                if not data:
+                    slots.release()
+                    break
+                tasks.append(asyncio.create_task(upload_part(len(tasks) + 1, data)))
+            parts = await asyncio.gather(*tasks)
+            await client.complete_multipart_upload(
+                Bucket=self.bucket,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={"Parts": list(parts)}
+            )
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            await client.abort_multipart_upload(Bucket=self.bucket, Key=key, UploadId=upload_id)
+            raise
+
     async def download_file(self, key: str) -> Any:
         """下载文件内容"""
         if self._client is None:
@@ -111,6 +399,59 @@ class AsyncS3Client:
 
         return content
 
+    async def download_fileobj(self, key: str, fileobj: BinaryIO) -> int:
+        """分块下载文件内容并写入 fileobj，内存中最多只保留一个块
+
+        Args:
+            key: 对象键
+            fileobj: 以二进制模式打开的可写文件对象
+
+        Returns:
+            int: 写入的字节数
+        """
+        if self._client is None:
+            raise S3ClientNotInitializedError
+
+        response = await self._client.get_object(
+            Bucket=self.bucket,
+            Key=key
+        )
+
+        written = 0
+        async with response['Body'] as stream:
+            while chunk := await stream.read(_DOWNLOAD_CHUNK_SIZE):
+                fileobj.write(chunk)
+                written += len(chunk)
+        return written
+
+    async def delete_files(self, keys: Iterable[str]) -> list[str]:
+        """批量删除对象，每 _DELETE_BATCH_SIZE 个键合并为一次 DeleteObjects 请求
+
+        Args:
+            keys: 对象键
+
+        Returns:
+            list[str]: 删除失败的对象键
+        """
+        if self._client is None:
+            raise S3ClientNotInitializedError
+        client = self._client
+        semaphore = asyncio.Semaphore(self.max_pool_connections)
+
+        async def delete_batch(batch: tuple[str, ...]) -> list[str]:
+            async with semaphore:
+                response = await client.delete_objects(
+                    Bucket=self.bucket,
+                    Delete={"Objects": [{"Key": key} for key in batch], "Quiet": True}
+                )
+            # Quiet 模式下响应只包含删除失败的对象
+            return [error["Key"] for error in response.get("Errors", [])]
+
+        results = await asyncio.gather(*(
+            delete_batch(batch) for batch in itertools.batched(keys, _DELETE_BATCH_SIZE)
+        ))
+        return [key for failed in results for key in failed]
+
     async def download_file_by_filename(self, filename: str) -> Any:
         """通过原始文件名下载文件"""
         encoded_key = self._encode_filename(filename)
@@ -119,8 +460,29 @@ class AsyncS3Client:
     async def generate_presigned_url(self, key: str, expires_days: int = 7) -> str:
         if self._client is None:
             raise S3ClientNotInitializedError
-        return await self._client.generate_presigned_url(
-            "get_object",
-            Params={"Bucket": self.bucket, "Key": key},
-            ExpiresIn=int(timedelta(days=expires_days).total_seconds())
-        )
+
+        # 进入新的一小时后丢弃之前的URL，保证返回的URL剩余有效期不少于请求值减一小时
+        period = int(time.time() // _URL_CACHE_PERIOD)
+        if period != self._url_cache_period:
+            self._url_cache.clear()
+            self._url_cache_period = period
+
+        cache_key = (key, expires_days)
+        url = self._url_cache.get(cache_key)
+        if url is not None:
+            self._url_cache.move_to_end(cache_key)
+            return url
+
+        expires_in = int(timedelta(days=expires_days).total_seconds())
+        if self._presigner is not None and self.bucket:
+            url = self._presigner.presign(self.bucket, key, expires_in)
+        else:
+            url = await self._client.generate_presigned_url(
+                "get_object",
+                Params={"Bucket": self.bucket, "Key": key},
+                ExpiresIn=expires_in
+            )
+        self._url_cache[cache_key] = url
+        if len(self._url_cache) > _URL_CACHE_SIZE:
+            self._url_cache.popitem(last=False)
+        return url
@@ -20,7 +20,9 @@ class TestAsyncParsers:
 
     @pytest.fixture
     def docx_parser(self):
-        return DocxDocumentParser()
+        with patch('parsers.docx_parser._get_docx_executor', return_value=None), \
+                patch('parsers.docx_parser.settings', Mock(DOCX_CACHE_ENTRIES=0)):
+            yield DocxDocumentParser()
 
     @pytest.fixture
     def excel_parser(self):
@@ -28,7 +30,8 @@ class TestAsyncParsers:
 
     @pytest.fixture
     def pdf_parser(self):
-        return PdfDocumentParser()
+        with patch('parsers.pdf_parser._get_pdf_executor', return_value=None):
+            yield PdfDocumentParser()
 
     def create_mock_chunk_data(self, chunk_type: ChunkType, **kwargs):
         """创建正确的 Mock ChunkData 对象"""
@@ -54,13 +57,14 @@ class TestAsyncParsers:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(docx_parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
             
             # Mock 各种提取方法，返回正确的 ChunkData 对象
-            with patch.object(docx_parser, '_extract_images_async') as mock_images:
-                with patch.object(docx_parser, '_extract_tables_async') as mock_tables:
-                    with patch.object(docx_parser, '_extract_texts_async') as mock_texts:
+            with patch.object(DocxDocumentParser, '_extract_images') as mock_images:
+                with patch.object(DocxDocumentParser, '_extract_tables') as mock_tables:
+                    with patch.object(DocxDocumentParser, '_extract_texts') as mock_texts:
                         
                         # 设置返回值 - 使用正确的 Mock 对象
                         mock_images.return_value = [
@@ -127,28 +131,6 @@ class TestAsyncParsers:
                 assert len(result.tables) == 2
                 assert len(result.images) == 1
 
-    def create_async_mock_file(self, read_data: bytes):
-        """创建支持异步上下文管理器的 mock 文件对象"""
-        mock_file = Mock()
-        
-        # 创建异步 read 方法
-        async def async_read():
-            return read_data
-        
-        mock_file.read = async_read
-        
-        # 创建异步上下文管理器
-        async def async_enter(self):
-            return mock_file
-        
-        async def async_exit(self, exc_type, exc_val, exc_tb):
-            pass
-        
-        mock_file.__aenter__ = async_enter
-        mock_file.__aexit__ = async_exit
-        
-        return mock_file
-
     @pytest.mark.asyncio
     async def test_pdf_parallel_processing(self, pdf_parser):
         """测试PDF解析器的并行处理"""
@@ -168,18 +150,14 @@ class TestAsyncParsers:
             # Mock 图片文件读取和文件存在检查
             with patch('builtins.open', mock_open(read_data=b'fake_image_data')):
                 with patch('os.path.exists', return_value=True):
-                    # 创建支持异步的 mock 文件
-                    async_mock_file = self.create_async_mock_file(b'fake_image_data')
-                    with patch('aiofiles.open', return_value=async_mock_file):
-                        
-                        result = await pdf_parser.parse(file_path)
-                        
-                        # 验证结果
-                        assert result.success is True
-                        assert len(result.images) == 1
-                        assert len(result.tables) == 1
-                        assert len(result.texts) == 1
-                        assert len(result.formulas) == 1
+                    result = await pdf_parser.parse(file_path)
+
+                    # 验证结果
+                    assert result.success is True
+                    assert len(result.images) == 1
+                    assert len(result.tables) == 1
+                    assert len(result.texts) == 1
+                    assert len(result.formulas) == 1
 
     @pytest.mark.asyncio
     async def test_parallel_processing_performance(self, docx_parser):
@@ -198,25 +176,23 @@ class TestAsyncParsers:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(docx_parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
             
-            # Mock 提取方法，模拟处理时间
-            async def mock_extract_images(pictures):
-                await asyncio.sleep(0.1)  # 模拟100ms处理时间
+            # Mock 提取方法，提取在内存中同步完成
+            def mock_extract_images(pictures):
                 return [self.create_mock_chunk_data(ChunkType.IMAGE)]
             
-            async def mock_extract_tables(tables):
-                await asyncio.sleep(0.2)  # 模拟200ms处理时间
+            def mock_extract_tables(tables):
                 return [self.create_mock_chunk_data(ChunkType.TABLE)]
             
-            async def mock_extract_texts(texts):
-                await asyncio.sleep(0.15)  # 模拟150ms处理时间
+            def mock_extract_texts(texts):
                 return [self.create_mock_chunk_data(ChunkType.TEXT)]
             
-            with patch.object(docx_parser, '_extract_images_async', side_effect=mock_extract_images):
-                with patch.object(docx_parser, '_extract_tables_async', side_effect=mock_extract_tables):
-                    with patch.object(docx_parser, '_extract_texts_async', side_effect=mock_extract_texts):
+            with patch.object(DocxDocumentParser, '_extract_images', side_effect=mock_extract_images):
+                with patch.object(DocxDocumentParser, '_extract_tables', side_effect=mock_extract_tables):
+                    with patch.object(DocxDocumentParser, '_extract_texts', side_effect=mock_extract_texts):
                         
                         start_time = time.time()
                         result = await docx_parser.parse(Path(file_path))
@@ -225,9 +201,8 @@ class TestAsyncParsers:
                         # 验证结果
                         assert result.success is True
                         
-                        # 并行处理时间应该接近最慢的任务的时间（200ms）
-                        # 而不是所有任务时间的总和（450ms）
-                        print(f"并行处理时间: {processing_time:.3f}秒")
+                        # 提取不再分派到线程池，整体开销应很小
+                        print(f"处理时间: {processing_time:.3f}秒")
                         # 考虑到测试环境的开销，放宽时间限制
                         assert processing_time < 0.6  # 应该小于600ms
 
@@ -245,13 +220,14 @@ class TestAsyncParsers:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(docx_parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
             
             # 模拟某些处理失败
-            with patch.object(docx_parser, '_extract_images_async', side_effect=Exception("图片处理失败")):
-                with patch.object(docx_parser, '_extract_tables_async', return_value=[self.create_mock_chunk_data(ChunkType.TABLE)]):
-                    with patch.object(docx_parser, '_extract_texts_async', return_value=[self.create_mock_chunk_data(ChunkType.TEXT)]):
+            with patch.object(DocxDocumentParser, '_extract_images', side_effect=Exception("图片处理失败")):
+                with patch.object(DocxDocumentParser, '_extract_tables', return_value=[self.create_mock_chunk_data(ChunkType.TABLE)]):
+                    with patch.object(DocxDocumentParser, '_extract_texts', return_value=[self.create_mock_chunk_data(ChunkType.TEXT)]):
                         
                         result = await docx_parser.parse(Path(file_path))
                         
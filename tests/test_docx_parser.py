@@ -6,10 +6,14 @@ DOCX解析器测试模块
 
 import pytest
 import asyncio
+import os
+from concurrent.futures.process import BrokenProcessPool
 from unittest.mock import Mock, patch, AsyncMock
 from pathlib import Path
 
-from parsers.docx_parser import DocxDocumentParser
+from parsers.content_cache import ContentCache
+import parsers.docx_parser as docx_parser_module
+from parsers.docx_parser import DocxDocumentParser, _get_docx_executor, _run_in_docx_executor
 from parsers.base_models import DocumentData, ChunkData, ChunkType, TableDataItem
 
 
@@ -18,8 +22,10 @@ class TestDocxDocumentParserParse:
 
     @pytest.fixture
     def parser(self):
-        """创建解析器实例"""
-        return DocxDocumentParser()
+        """创建不带缓存的解析器实例，转换在默认线程池中执行以便使用模拟转换器"""
+        with patch('parsers.docx_parser._get_docx_executor', return_value=None), \
+                patch.object(docx_parser_module, 'settings', Mock(DOCX_CACHE_ENTRIES=0)):
+            yield DocxDocumentParser()
 
     @pytest.fixture
     def mock_doc_data(self):
@@ -79,7 +85,8 @@ class TestDocxDocumentParserParse:
         """测试成功解析DOCX文件"""
         file_path = "/path/to/test.docx"
         
-        with patch.object(parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_converter_result
             result = await parser.parse(file_path)
             
@@ -131,7 +138,8 @@ class TestDocxDocumentParserParse:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
             
             result = await parser.parse(file_path)
@@ -143,6 +151,23 @@ class TestDocxDocumentParserParse:
             assert len(result.tables) == 0
             assert len(result.images) == 0
 
+    @pytest.mark.asyncio
+    async def test_parse_title_after_many_paragraphs(self, parser):
+        """测试标题出现在大量正文之后时仍能找到"""
+        mock_doc = Mock()
+        mock_doc.name = "长前言文档.docx"
+        mock_doc.pictures = []
+        mock_doc.tables = []
+        mock_doc.texts = [Mock(text=f"前言{i}", label="text") for i in range(20)]
+        mock_doc.texts.append(Mock(text="迟到的标题", label="title"))
+
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_get_converter.return_value.convert.return_value = Mock(document=mock_doc)
+
+            result = await parser.parse("/path/to/late_title.docx")
+
+            assert result.title == "迟到的标题"
+
     @pytest.mark.asyncio
     async def test_parse_empty_document(self, parser):
         """测试空文档解析"""
@@ -157,7 +182,8 @@ class TestDocxDocumentParserParse:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
             
             result = await parser.parse(file_path)
@@ -173,7 +199,8 @@ class TestDocxDocumentParserParse:
         """测试转换器错误处理"""
         file_path = "/path/to/invalid.docx"
         
-        with patch.object(parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.side_effect = Exception("转换失败")
             
             with pytest.raises(Exception, match="Failed to parse DOCX file /path/to/invalid.docx"):
@@ -217,7 +244,8 @@ class TestDocxDocumentParserParse:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
         
             result = await parser.parse(file_path)
@@ -228,7 +256,10 @@ class TestDocxDocumentParserParse:
             table = result.tables[0].content
             assert table.rows == 3
             assert table.columns == 4
-            assert table.grid == [["姓名", "年龄", "职业", "薪资"], ["张三", "25", "工程师", "15000"], ["李四", "30", "设计师", "18000"]]
+            assert table.grid == ["姓名", "年龄", "职业", "薪资", "张三", "25", "工程师", "15000", "李四", "30", "设计师", "18000"]
+            assert table.cell(2, 2) == "设计师"
+            assert table.column_headers == ["姓名", "年龄", "职业", "薪资"]
+            assert table.row_headers == []
             assert table.caption == ["复杂表格"]
             assert table.footnote == []
 
@@ -256,7 +287,8 @@ class TestDocxDocumentParserParse:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
             
             result = await parser.parse(file_path)
@@ -290,7 +322,8 @@ class TestDocxDocumentParserParse:
         mock_result = Mock()
         mock_result.document = mock_doc
         
-        with patch.object(parser, '_converter') as mock_converter:
+        with patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
             mock_converter.convert.return_value = mock_result
             
             result = await parser.parse(file_path)
@@ -299,3 +332,103 @@ class TestDocxDocumentParserParse:
             assert len(result.texts) == 1
             assert result.texts[0].type == ChunkType.TEXT
             assert result.texts[0].content.text == "第一章 引言"
+
+    @pytest.mark.asyncio
+    async def test_parse_with_content_cache(self, tmp_path, mock_converter_result):
+        """测试同一文件重复解析时命中解析结果缓存"""
+        file_path = tmp_path / "cached.docx"
+        file_path.write_bytes(b"fake docx content")
+
+        with patch('parsers.docx_parser._get_docx_executor', return_value=None), \
+                patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_converter = mock_get_converter.return_value
+            mock_converter.convert.return_value = mock_converter_result
+            parser = DocxDocumentParser(cache=ContentCache())
+
+            first = await parser.parse(file_path)
+            second = await parser.parse(file_path)
+
+            assert mock_converter.convert.call_count == 1
+            assert second.title == first.title == "文档标题"
+            assert second.texts == first.texts
+            assert second.texts is not first.texts
+
+    @pytest.mark.asyncio
+    async def test_content_cache_keeps_file_name(self, tmp_path):
+        """测试内容相同但名称不同的文件不共用缓存，回退到文件名的标题各自正确"""
+        first_path = tmp_path / "report_a.docx"
+        second_path = tmp_path / "invoice_b.docx"
+        first_path.write_bytes(b"same content")
+        second_path.write_bytes(b"same content")
+
+        def convert(file_path):
+            mock_doc = Mock(pictures=[], tables=[], texts=[])
+            mock_doc.name = Path(file_path).stem
+            return Mock(document=mock_doc)
+
+        with patch('parsers.docx_parser._get_docx_executor', return_value=None), \
+                patch('parsers.docx_parser._get_docx_converter') as mock_get_converter:
+            mock_get_converter.return_value.convert.side_effect = convert
+            parser = DocxDocumentParser(cache=ContentCache())
+
+            first = await parser.parse(first_path)
+            second = await parser.parse(second_path)
+
+            assert first.title == "report_a"
+            assert second.title == "invoice_b"
+
+    def test_cache_enabled_by_default(self):
+        """测试默认构造的解析器按配置启用缓存"""
+        with patch.object(docx_parser_module, 'settings', Mock(DOCX_CACHE_ENTRIES=16)):
+            parser = DocxDocumentParser()
+        assert isinstance(parser._cache, ContentCache)
+        assert parser._cache.max_entries == 16
+
+        with patch.object(docx_parser_module, 'settings', Mock(DOCX_CACHE_ENTRIES=0)):
+            assert DocxDocumentParser()._cache is None
+
+
+class TestDocxProcessPool:
+    """通过真实的进程池解析DOCX文件"""
+
+    @pytest.fixture
+    def real_executor(self):
+        """使用单进程的真实进程池，测试结束后关闭"""
+        with patch.object(docx_parser_module, 'settings', Mock(DOCX_WORKERS=1, DOCX_CACHE_ENTRIES=0)):
+            executor = _get_docx_executor()
+            try:
+                yield executor
+            finally:
+                executor.shutdown()
+                docx_parser_module._DOCX_EXECUTOR = None
+
+    @pytest.mark.asyncio
+    async def test_parse_in_spawned_process(self, real_executor, tmp_path):
+        """测试进程池以 spawn 方式启动子进程并完成真实的DOCX转换"""
+        docx = pytest.importorskip("docx")
+        file_path = tmp_path / "real.docx"
+        document = docx.Document()
+        document.add_heading("真实标题", level=0)
+        document.add_paragraph("真实段落")
+        document.save(file_path)
+
+        result = await DocxDocumentParser().parse(file_path)
+
+        assert real_executor._mp_context.get_start_method() == "spawn"
+        assert result.success is True
+        assert result.title == "真实标题"
+        assert any(chunk.content.text == "真实段落" for chunk in result.texts)
+
+    @pytest.mark.asyncio
+    async def test_broken_pool_is_recreated(self, real_executor):
+        """测试子进程异常退出导致进程池损坏后，后续任务使用新建的进程池"""
+        with pytest.raises(BrokenProcessPool):
+            await _run_in_docx_executor(os._exit, 1)
+
+        assert docx_parser_module._DOCX_EXECUTOR is None
+        new_executor = _get_docx_executor()
+        try:
+            assert new_executor is not real_executor
+            assert await _run_in_docx_executor(abs, -1) == 1
+        finally:
+            new_executor.shutdown()
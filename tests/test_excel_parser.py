@@ -1,12 +1,14 @@
 import base64
 import os
+import re
 import tempfile
+import zipfile
 from pathlib import Path
 import pytest
 from openpyxl import Workbook
 from openpyxl.drawing.image import Image as XLImage
 
-from parsers.excel_parser import ExcelParser
+from parsers.excel_parser import ExcelParseConfig, ExcelParser
 from parsers.base_models import ChunkData
 
 
@@ -104,10 +106,115 @@ async def test_parse_real_merged_cells():
         assert table_chunk.type == "table"
 
         payload = table_chunk.content
-        assert payload.grid == [["Merged Header", "Merged Header"], ["Value1", "Value2"]]
+        assert payload.grid == ["Merged Header", "Merged Header", "Value1", "Value2"]
+        assert payload.cell(1, 0) == "Value1"
         assert payload.rows == 2
         assert payload.columns == 2
     finally:
         os.remove(xlsx_path)
 
 
+
+
+@pytest.mark.asyncio
+async def test_parse_images_numbered_across_sheets():
+    # 多个工作表中的图片按工作表顺序连续编号
+    one_px_png_b64 = (
+        b"iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAQAAAC1HAwCAAAAC0lEQVR42mP8/x8AAusB9Y2oU5wAAAAASUVORK5CYII="
+    )
+    png_fd, png_path = tempfile.mkstemp(suffix=".png")
+    try:
+        with os.fdopen(png_fd, "wb") as f:
+            f.write(base64.b64decode(one_px_png_b64))
+
+        wb = Workbook()
+        ws1 = wb.active
+        ws1.title = "Sheet1"
+        ws1.add_image(XLImage(png_path), "A1")
+        ws1.add_image(XLImage(png_path), "C3")
+        ws2 = wb.create_sheet("Sheet2")
+        ws2.add_image(XLImage(png_path), "A1")
+
+        xlsx_fd, xlsx_path = tempfile.mkstemp(suffix=".xlsx")
+        xlsx_path = Path(xlsx_path)
+        os.close(xlsx_fd)
+        wb.save(xlsx_path)
+
+        try:
+            parser = ExcelParser()
+            for _ in range(2):
+                result = await parser.parse(xlsx_path)
+                assert [image.name for image in result.images] == [
+                    "#/pictures/0", "#/pictures/1", "#/pictures/2"
+                ]
+        finally:
+            os.remove(xlsx_path)
+    finally:
+        os.remove(png_path)
+
+
+@pytest.mark.asyncio
+async def test_parse_streaming_matches_full_load():
+    # 无图片和合并单元格时以只读模式流式读取，结果应与完整加载一致
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Sheet1"
+    ws["A1"] = "Header1"
+    ws["B1"] = "Header2"
+    ws["A3"] = 42
+    ws["B3"] = 2.5
+    wb.create_sheet("Empty")
+
+    xlsx_fd, xlsx_path = tempfile.mkstemp(suffix=".xlsx")
+    xlsx_path = Path(xlsx_path)
+    os.close(xlsx_fd)
+    wb.save(xlsx_path)
+
+    try:
+        parser = ExcelParser()
+        assert parser._has_layout_parts(xlsx_path) is False
+        streamed = await parser.parse(xlsx_path)
+        loaded = await ExcelParser(ExcelParseConfig(streaming=False)).parse(xlsx_path)
+
+        assert streamed.tables == loaded.tables
+        assert streamed.texts == loaded.texts
+        assert streamed.tables[0].content.grid == ["Header1", "Header2", "", "", "42", "2.5"]
+    finally:
+        os.remove(xlsx_path)
+
+
+@pytest.mark.asyncio
+async def test_parse_streaming_ignores_stale_dimension():
+    # 只读模式不能信任 <dimension> 标签，过期的维度也应读出全部单元格
+    wb = Workbook()
+    ws = wb.active
+    for row in range(1, 6):
+        for col in range(1, 4):
+            ws.cell(row=row, column=col, value=f"r{row}c{col}")
+
+    xlsx_fd, xlsx_path = tempfile.mkstemp(suffix=".xlsx")
+    xlsx_path = Path(xlsx_path)
+    os.close(xlsx_fd)
+    wb.save(xlsx_path)
+
+    # 把工作表 XML 中的维度改写为过期的 A1
+    stale_path = xlsx_path.with_name(f"stale_{xlsx_path.name}")
+    with zipfile.ZipFile(xlsx_path) as source, zipfile.ZipFile(stale_path, "w") as target:
+        for item in source.infolist():
+            data = source.read(item.filename)
+            if item.filename == "xl/worksheets/sheet1.xml":
+                data = re.sub(rb'<dimension ref="[^"]*"', b'<dimension ref="A1"', data)
+            target.writestr(item, data)
+
+    try:
+        streamed = await ExcelParser().parse(stale_path)
+        loaded = await ExcelParser(ExcelParseConfig(streaming=False)).parse(stale_path)
+
+        table = streamed.tables[0].content
+        assert (table.rows, table.columns) == (5, 3)
+        assert len(table.grid) == 15
+        assert table.grid[-1] == "r5c3"
+        assert streamed.tables == loaded.tables
+    finally:
+        os.remove(xlsx_path)
+        os.remove(stale_path)
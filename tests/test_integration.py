@@ -185,11 +185,8 @@ class TestS3Integration:
             ("doc3.txt", b"Document 3 content")
         ]
         
-        # 批量上传（逐个上传，因为新版本没有upload_files方法）
-        presigned_urls = []
-        for filename, content in test_files:
-            presigned_url = await s3_client.upload_file(filename, content)
-            presigned_urls.append(presigned_url)
+        # 批量上传
+        presigned_urls = await s3_client.upload_files(test_files)
         
         # 验证结果
         assert len(presigned_urls) == 3
@@ -5,10 +5,17 @@ PDF解析器测试模块
 """
 
 import pytest
-from unittest.mock import Mock, patch
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import AsyncMock, Mock, mock_open, patch
 from pathlib import Path
 
-from parsers.pdf_parser import PdfDocumentParser
+import parsers.pdf_parser as pdf_parser_module
+from parsers.pdf_parser import (
+    PdfDocumentParser,
+    _get_cleanup_executor,
+    _get_pdf_executor,
+    _remove_dir_in_background,
+)
 from parsers.base_models import ChunkType
 
 
@@ -17,8 +24,9 @@ class TestPdfDocumentParserParse:
 
     @pytest.fixture
     def parser(self):
-        """创建解析器实例"""
-        return PdfDocumentParser()
+        """创建解析器实例，模型解析在当前进程的线程池中执行，便于替换为 mock"""
+        with patch('parsers.pdf_parser._get_pdf_executor', return_value=None):
+            yield PdfDocumentParser()
 
     @pytest.fixture
     def mock_content_list(self):
@@ -48,28 +56,6 @@ class TestPdfDocumentParserParse:
             }
         ]
 
-    def create_async_mock_file(self, read_data: bytes):
-        """创建支持异步上下文管理器的 mock 文件对象"""
-        mock_file = Mock()
-        
-        # 创建异步 read 方法
-        async def async_read():
-            return read_data
-        
-        mock_file.read = async_read
-        
-        # 创建异步上下文管理器
-        async def async_enter(self):
-            return mock_file
-        
-        async def async_exit(self, exc_type, exc_val, exc_tb):
-            pass
-        
-        mock_file.__aenter__ = async_enter
-        mock_file.__aexit__ = async_exit
-        
-        return mock_file
-
     @pytest.mark.asyncio
     async def test_parse_success(self, parser, mock_content_list):
         """测试成功解析PDF文件"""
@@ -77,9 +63,8 @@ class TestPdfDocumentParserParse:
         
         with patch.object(parser, '_parse_pdf_to_content_list') as mock_parse:
             mock_parse.return_value = mock_content_list
-            # 使用异步 mock 模拟图片文件的读取
-            async_mock_file = self.create_async_mock_file(b'test_image_content')
-            with patch('aiofiles.open', return_value=async_mock_file):
+            # 模拟图片文件的读取
+            with patch('builtins.open', mock_open(read_data=b'test_image_content')):
                 with patch('os.path.exists', return_value=True):
                     result = await parser.parse(file_path)
                     
@@ -136,9 +121,8 @@ class TestPdfDocumentParserParse:
         
         with patch.object(parser, '_parse_pdf_to_content_list') as mock_parse:
             mock_parse.return_value = mock_content
-            # 使用异步 mock 模拟图片文件，并确保文件路径存在
-            async_mock_file = self.create_async_mock_file(b'fake_jpeg_data')
-            with patch('aiofiles.open', return_value=async_mock_file):
+            # 模拟图片文件，并确保文件路径存在
+            with patch('builtins.open', mock_open(read_data=b'fake_jpeg_data')):
                 with patch('os.path.exists', return_value=True):
                     result = await parser.parse(Path(file_path))
                     
@@ -221,9 +205,8 @@ class TestPdfDocumentParserParse:
         
         with patch.object(parser, '_parse_pdf_to_content_list') as mock_parse:
             mock_parse.return_value = mock_content
-            # 使用异步 mock 模拟图片文件，并确保文件路径存在
-            async_mock_file = self.create_async_mock_file(b'mixed_content_image')
-            with patch('aiofiles.open', return_value=async_mock_file):
+            # 模拟图片文件，并确保文件路径存在
+            with patch('builtins.open', mock_open(read_data=b'mixed_content_image')):
                 with patch('os.path.exists', return_value=True):
                     result = await parser.parse(Path(file_path))
                     
@@ -232,3 +215,117 @@ class TestPdfDocumentParserParse:
                     assert len(result.images) == 1
                     assert len(result.tables) == 1
                     assert len(result.formulas) == 1
+
+    def test_encode_image_file_in_chunks(self, parser, tmp_path):
+        """测试分块编码的图片与整体编码结果一致"""
+        import base64
+
+        from parsers.pdf_parser import _IMAGE_CHUNK_SIZE
+
+        image_data = bytes(range(256)) * (_IMAGE_CHUNK_SIZE // 256 * 2 + 7)
+        image_path = tmp_path / "image.png"
+        image_path.write_bytes(image_data)
+
+        assert parser._encode_image_file(image_path) == base64.b64encode(image_data).decode("ascii")
+
+    @pytest.mark.asyncio
+    async def test_parse_batch(self, parser, tmp_path):
+        """测试批量解析多个PDF文件"""
+        file_paths = [Path("/path/to/a.pdf"), Path("/path/to/b.pdf")]
+        content_lists = [
+            [{"type": "text", "text": "标题A", "text_level": 1}, {"type": "text", "text": "内容A", "text_level": 0}],
+            [{"type": "equation", "text": "x + y = z", "text_format": "latex"}],
+        ]
+
+        # 与 MinerU 一致，prepare_env 返回字符串路径
+        image_dir = tmp_path / "images"
+        image_dir.mkdir()
+        with patch('parsers.pdf_parser.prepare_env', return_value=(str(image_dir), str(tmp_path))):
+            with patch.object(parser, '_parse_pdfs_to_content_lists', return_value=content_lists) as mock_parse:
+                results = await parser.parse_batch(file_paths)
+
+        assert mock_parse.call_count == 1
+        assert mock_parse.call_args[0][0] == file_paths
+        assert [result.title for result in results] == ["标题A", "b"]
+        assert len(results[0].texts) == 1
+        assert len(results[1].formulas) == 1
+        # 中间图片目录在后台被删除
+        _get_cleanup_executor().submit(lambda: None).result()
+        assert not image_dir.exists()
+
+    def test_process_table_with_spans(self, parser):
+        """测试 rowspan 与 colspan 占据的位置被正确跳过和填充"""
+        table = {
+            "table_body": (
+                '<table><tr><th rowspan="2">A</th><td colspan="2"> x  y </td></tr>'
+                '<tr><td>1</td><td>2</td></tr></table>'
+            ),
+            "table_caption": [],
+            "table_footnote": [],
+        }
+
+        result = parser._process_table(0, table)
+
+        assert result.content.rows == 2
+        assert result.content.columns == 3
+        assert result.content.grid == ["A", "x y", "x y", "A", "1", "2"]
+
+    @pytest.mark.asyncio
+    async def test_warm_up_starts_every_worker(self, parser):
+        """测试预热为进程池的每个子进程提交一个空任务"""
+        with patch('parsers.pdf_parser.settings', Mock(PDF_WORKERS=3)), \
+             patch('parsers.pdf_parser._pdf_worker_ready') as mock_ready:
+            await parser.warm_up()
+
+        assert mock_ready.call_count == 3
+
+    @pytest.mark.asyncio
+    async def test_broken_process_pool_is_recreated(self, tmp_path):
+        """测试子进程异常退出导致进程池损坏后，后续任务使用新建的进程池"""
+        broken = Mock()
+        broken.submit.side_effect = BrokenProcessPool("child died")
+        file_path = tmp_path / "big.pdf"
+
+        with patch.object(pdf_parser_module, '_PDF_EXECUTOR', broken), \
+                patch('parsers.pdf_parser.ProcessPoolExecutor') as mock_pool_class:
+            parser = PdfDocumentParser()
+            with pytest.raises(Exception, match="BrokenProcessPool"):
+                await parser.parse(file_path)
+
+            broken.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+            assert pdf_parser_module._PDF_EXECUTOR is None
+            assert _get_pdf_executor() is mock_pool_class.return_value
+
+    def test_remove_dir_in_background(self, tmp_path):
+        """测试中间图片目录被移走并在后台删除，不存在的目录直接忽略"""
+        image_dir = tmp_path / "images"
+        image_dir.mkdir()
+        (image_dir / "a.jpg").write_bytes(b"jpg")
+
+        _remove_dir_in_background(str(image_dir))
+        _remove_dir_in_background(str(tmp_path / "missing"))
+        # 等待清理线程完成已提交的删除
+        _get_cleanup_executor().submit(lambda: None).result()
+
+        assert not image_dir.exists()
+        assert list(tmp_path.iterdir()) == []
+
+
+class TestPdfParserWarmUp:
+    """测试解析任务循环启动时的解析器预热"""
+
+    @pytest.mark.asyncio
+    async def test_worker_warms_up_pdf_parser(self):
+        """测试 worker 在领取第一个任务前注册PDF解析器并等待其预热完成"""
+        from worker import worker
+        from parsers import PARSER_REGISTRY
+
+        app = Mock()
+        app.ctx.task_manager.get_tasks = AsyncMock(side_effect=RuntimeError("stop"))
+        with patch.object(PdfDocumentParser, 'warm_up', new_callable=AsyncMock) as mock_warm_up:
+            with pytest.raises(RuntimeError, match="stop"):
+                await worker(app)
+
+        assert PARSER_REGISTRY['.pdf'] is PdfDocumentParser
+        mock_warm_up.assert_awaited_once()
+        app.ctx.task_manager.get_tasks.assert_awaited_once()
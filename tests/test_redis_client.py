@@ -1,7 +1,9 @@
 # tests/test_redis_client.py
 import pytest
 import json
-from unittest.mock import patch, AsyncMock
+import orjson
+from unittest.mock import patch, AsyncMock, MagicMock
+from redis.exceptions import ResponseError
 from storage.redis_client import get_redis_client, TaskManager
 
 pytestmark = pytest.mark.asyncio
@@ -52,7 +54,7 @@ class TestTaskManager:
         assert result is True
         task_manager.redis.rpush.assert_called_once_with(
             "test_queue", 
-            json.dumps(task_data)
+            orjson.dumps(task_data)
         )
     
     async def test_push_task_failure(self, task_manager):
@@ -83,6 +85,62 @@ class TestTaskManager:
         
         assert result is None
     
+    async def test_get_tasks_batch(self, task_manager):
+        """测试批量获取任务"""
+        tasks = [{"task_id": str(i)} for i in range(3)]
+        task_manager.redis.blmpop = AsyncMock(return_value=["test_queue", [json.dumps(task) for task in tasks]])
+
+        result = await task_manager.get_tasks(count=8)
+
+        assert result == tasks
+        task_manager.redis.blmpop.assert_called_once_with(1, 1, "test_queue", direction="LEFT", count=8)
+
+    async def test_get_tasks_no_data(self, task_manager):
+        """测试批量获取任务无数据"""
+        task_manager.redis.blmpop = AsyncMock(return_value=None)
+
+        result = await task_manager.get_tasks()
+
+        assert result == []
+
+    async def test_get_tasks_falls_back_without_blmpop(self, task_manager):
+        """测试 Redis 7.0 之前的版本回退为 BLPOP + 管道中的 LPOP，且只探测一次"""
+        tasks = [{"task_id": str(i)} for i in range(3)]
+        task_manager.redis.blmpop = AsyncMock(side_effect=ResponseError("unknown command 'BLMPOP'"))
+        task_manager.redis.blpop = AsyncMock(return_value=("test_queue", json.dumps(tasks[0])))
+        pipe = self.mock_pipeline(task_manager)
+        pipe.execute = AsyncMock(return_value=[json.dumps(tasks[1]), json.dumps(tasks[2]), None])
+
+        result = await task_manager.get_tasks(count=4)
+        await task_manager.get_tasks(count=4)
+
+        assert result == tasks
+        task_manager.redis.blmpop.assert_awaited_once()
+        assert task_manager.redis.blpop.await_count == 2
+        task_manager.redis.pipeline.assert_called_with(transaction=False)
+        assert pipe.lpop.call_count == 6
+        pipe.lpop.assert_called_with("test_queue")
+
+    async def test_get_tasks_fallback_no_data(self, task_manager):
+        """测试回退模式下队列为空时不再发送 LPOP"""
+        task_manager._blmpop_supported = False
+        task_manager.redis.blpop = AsyncMock(return_value=None)
+        task_manager.redis.pipeline = MagicMock()
+
+        result = await task_manager.get_tasks()
+
+        assert result == []
+        task_manager.redis.pipeline.assert_not_called()
+
+    async def test_get_tasks_other_error(self, task_manager):
+        """测试其他错误不会关闭 BLMPOP"""
+        task_manager.redis.blmpop = AsyncMock(side_effect=ResponseError("WRONGTYPE"))
+
+        result = await task_manager.get_tasks()
+
+        assert result == []
+        assert task_manager._blmpop_supported is True
+
     async def test_set_task_status(self, task_manager):
         """测试设置任务状态"""
         task_id = "123"
@@ -109,18 +167,42 @@ class TestTaskManager:
         assert result == expected_status
         task_manager.redis.get.assert_called_once_with(f"test_status:123")
     
+    def mock_pipeline(self, task_manager):
+        """模拟 redis 管道，命令在管道中缓存，execute 时一次发送"""
+        pipe = MagicMock()
+        pipe.__aenter__.return_value = pipe
+        pipe.execute = AsyncMock(return_value=[True, True])
+        task_manager.redis.pipeline = MagicMock(return_value=pipe)
+        return pipe
+
     async def test_update_task_status_with_result(self, task_manager):
         """测试更新任务状态和结果"""
         task_id = "123"
         status = "completed"
         result_data = {"text": "extracted text"}
-        task_manager.redis.setex = AsyncMock(return_value=True)
+        pipe = self.mock_pipeline(task_manager)
         
         result = await task_manager.update_task_status(task_id, status, result_data)
         
         assert result is True
-        # 验证调用了两次：状态更新 + 结果存储
-        assert task_manager.redis.setex.call_count == 2
+        # 验证调用了两次：状态更新 + 结果存储，并且只执行一次管道
+        assert pipe.setex.call_count == 2
+        pipe.setex.assert_any_call("test_status:123", 3600, status)
+        pipe.setex.assert_any_call("task_result:123", 86400, orjson.dumps(result_data))
+        pipe.execute.assert_awaited_once()
+
+    async def test_submit_task(self, task_manager):
+        """测试在同一事务中设置初始状态并推送任务"""
+        task_data = {"task_id": "123", "type": "test"}
+        pipe = self.mock_pipeline(task_manager)
+
+        result = await task_manager.submit_task(task_data)
+
+        assert result is True
+        task_manager.redis.pipeline.assert_called_once_with(transaction=True)
+        pipe.setex.assert_called_once_with("test_status:123", 3600, "pending")
+        pipe.rpush.assert_called_once_with("test_queue", orjson.dumps(task_data))
+        pipe.execute.assert_awaited_once()
     
     async def test_get_task_result(self, task_manager):
         """测试获取任务结果"""
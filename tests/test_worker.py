@@ -0,0 +1,149 @@
+"""
+解析任务循环测试模块
+
+测试 worker 批量领取任务、解析并写回结果
+"""
+
+import asyncio
+
+import pytest
+from pathlib import Path
+from unittest.mock import AsyncMock, Mock, patch
+
+from parsers import parse_many
+from parsers.base_models import ChunkData, ChunkType, DocumentData, DocumentParser, TextDataItem
+from worker import TASK_BATCH_SIZE, worker
+
+pytestmark = pytest.mark.asyncio
+
+
+@pytest.fixture
+def app():
+    """模拟 Sanic 应用，任务管理器在返回一批任务后停止循环"""
+    app = Mock()
+    app.ctx.task_manager.update_task_status = AsyncMock(return_value=True)
+    return app
+
+
+@pytest.fixture(autouse=True)
+def no_warm_up():
+    """跳过解析器加载与预热，增强直接返回原始块"""
+    with patch('worker.load_all_parsers'), \
+            patch('worker.warm_up_parsers', new_callable=AsyncMock), \
+            patch('worker.enhance_chunks', new=AsyncMock(side_effect=lambda chunks, concurrency: chunks)):
+        yield
+
+
+def make_document(text: str) -> DocumentData:
+    return DocumentData(
+        title=text,
+        texts=[ChunkData(type=ChunkType.TEXT, name="#/texts/0", content=TextDataItem(text=text))],
+        success=True,
+    )
+
+
+async def test_worker_processes_every_task_in_batch(app):
+    """测试一次领取的所有任务都被解析并写回结果"""
+    tasks = [
+        {"task_id": "1", "file_path": "/data/a.docx"},
+        {"task_id": "2", "file_path": "/data/b.docx"},
+    ]
+    app.ctx.task_manager.get_tasks = AsyncMock(side_effect=[tasks, RuntimeError("stop")])
+    parser = Mock(spec=DocumentParser)
+    parser.parse = AsyncMock(side_effect=lambda path: make_document(path.stem))
+
+    with patch('parsers.parser_registry.get_parser', return_value=parser):
+        with pytest.raises(RuntimeError, match="stop"):
+            await worker(app)
+
+    app.ctx.task_manager.get_tasks.assert_awaited_with(TASK_BATCH_SIZE)
+    parser.parse.assert_any_await(Path("/data/a.docx"))
+    update = app.ctx.task_manager.update_task_status
+    assert update.await_count == 2
+    task_id, status, result = update.await_args_list[1].args
+    assert (task_id, status) == ("2", "completed")
+    assert result["title"] == "b"
+    assert result["texts"][0]["content"]["text"] == "b"
+
+
+async def test_worker_marks_failed_tasks(app):
+    """测试单个任务解析失败或没有解析器时标记为 failed，不影响同批其他任务"""
+    tasks = [
+        {"task_id": "1", "file_path": "/data/broken.docx"},
+        {"task_id": "2", "file_path": "/data/unknown.txt"},
+        {"task_id": "3", "file_path": "/data/ok.docx"},
+    ]
+    app.ctx.task_manager.get_tasks = AsyncMock(side_effect=[tasks, RuntimeError("stop")])
+
+    async def parse(path):
+        if path.stem == "broken":
+            raise Exception("parse failed")
+        return make_document(path.stem)
+
+    parser = Mock(spec=DocumentParser)
+    parser.parse = AsyncMock(side_effect=parse)
+
+    with patch('parsers.parser_registry.get_parser', side_effect=lambda path: None if path.endswith(".txt") else parser):
+        with pytest.raises(RuntimeError, match="stop"):
+            await worker(app)
+
+    statuses = [call.args[:2] for call in app.ctx.task_manager.update_task_status.await_args_list]
+    assert statuses == [("1", "failed"), ("2", "failed"), ("3", "completed")]
+
+
+async def test_parse_many_waits_for_every_file():
+    """测试单个文件解析失败时，其他文件的解析仍会完成并按顺序返回"""
+    finished = []
+
+    async def parse(path):
+        if path.stem == "broken":
+            raise ValueError("parse failed")
+        await asyncio.sleep(0.01)
+        finished.append(path.stem)
+        return make_document(path.stem)
+
+    parser = Mock(spec=DocumentParser)
+    parser.parse = AsyncMock(side_effect=parse)
+
+    with patch('parsers.parser_registry.get_parser', side_effect=lambda path: None if path.endswith(".txt") else parser):
+        results = await parse_many(["/data/broken.docx", "/data/a.docx", "/data/b.txt"], concurrency=2)
+
+    assert isinstance(results[0], ValueError)
+    assert results[1].title == "a"
+    assert results[2] is None
+    assert finished == ["a"]
+
+
+async def test_parse_many_batches_files_of_one_parser():
+    """测试同一解析器的多个文件交给 parse_batch 一次处理，结果按原顺序返回"""
+    pdf_parser = Mock()
+    pdf_parser.parse_batch = AsyncMock(side_effect=lambda paths: [make_document(path.stem) for path in paths])
+    docx_parser = Mock(spec=DocumentParser)
+    docx_parser.parse = AsyncMock(side_effect=lambda path: make_document(path.stem))
+
+    with patch('parsers.parser_registry.get_parser',
+               side_effect=lambda path: pdf_parser if path.endswith(".pdf") else docx_parser):
+        results = await parse_many(["/data/a.pdf", "/data/b.docx", "/data/c.pdf"])
+
+    pdf_parser.parse_batch.assert_awaited_once_with([Path("/data/a.pdf"), Path("/data/c.pdf")])
+    pdf_parser.parse.assert_not_called()
+    assert [result.title for result in results] == ["a", "b", "c"]
+
+
+async def test_parse_many_falls_back_when_batch_fails():
+    """测试整批解析失败时逐个重新解析，只有出错的文件失败"""
+    async def parse(path):
+        if path.stem == "broken":
+            raise ValueError("parse failed")
+        return make_document(path.stem)
+
+    pdf_parser = Mock()
+    pdf_parser.parse_batch = AsyncMock(side_effect=Exception("batch failed"))
+    pdf_parser.parse = AsyncMock(side_effect=parse)
+
+    with patch('parsers.parser_registry.get_parser', return_value=pdf_parser):
+        results = await parse_many(["/data/a.pdf", "/data/broken.pdf"])
+
+    pdf_parser.parse_batch.assert_awaited_once()
+    assert results[0].title == "a"
+    assert isinstance(results[1], ValueError)
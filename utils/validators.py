@@ -29,8 +29,9 @@ def validate_file_info(file_info: dict) -> tuple[str, bytes]:
         raise ValidationError("无效的base64编码") from e
 
     # 检查文件格式
-    file_ext = filename.lower().split('.')[-1] if '.' in filename else ''
-    if file_ext not in [fmt.lstrip('.') for fmt in settings.SUPPORTED_FORMATS]:
+    _, dot, file_ext = filename.rpartition('.')
+    file_ext = file_ext.lower() if dot else ''
+    if file_ext not in settings.SUPPORTED_FORMATS:
         raise ValidationError(f"不支持的文件格式: {file_ext}")
 
     return filename, content
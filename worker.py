@@ -1,51 +1,64 @@
-import asyncio
+import logging
+from dataclasses import asdict
 from typing import Any
 
 from sanic import Sanic
 
-from enhancers import get_enhancer
-from parsers import ChunkData, ChunkType, get_parser, load_all_parsers
+from enhancers import enhance_chunks
+from parsers import DocumentData, load_all_parsers, parse_many, warm_up_parsers
+from storage.redis_client import TaskManager
 
+logger = logging.getLogger(__name__)
 
-async def worker(app: Sanic) -> dict[str, Any]:
+# 每次从队列领取的任务数上限
+TASK_BATCH_SIZE = 8
+# 控制并发数量，防止访问量过大导致失败
+SEMAPHORE_LIMIT = 10
+
+
+async def worker(app: Sanic) -> None:
+    """解析任务循环：批量领取任务，解析并增强后写回任务状态与结果"""
     # 使用工厂获取合适的解析器
     load_all_parsers()
-    redis = app.ctx.redis
+    # 在领取任务前完成模型加载，避免第一个任务承担冷启动开销
+    await warm_up_parsers()
+    task_manager: TaskManager = app.ctx.task_manager
     while True:
-        task = await redis.get_task()
-        if not task:
-            await asyncio.sleep(1)
-            continue
-        file_path = task.get("file_path")
-        parser = get_parser(file_path)
-        if not parser:
+        # 队列为空时 get_tasks 最多阻塞1秒，无需额外休眠
+        tasks = await task_manager.get_tasks(TASK_BATCH_SIZE)
+        if not tasks:
             continue
-        parse_result = await parser.parse(file_path)
-        if not parse_result.success:
-            continue
-        # 控制并发数量，防止访问量过大导致失败
-        SEMAPHORE_LIMIT = 10
-        semaphore = asyncio.Semaphore(SEMAPHORE_LIMIT)
-
-        async def enhance_with_semaphore(chunk: ChunkData, semaphore: asyncio.Semaphore) -> ChunkData:
-            async with semaphore:
-                enhancer = get_enhancer(ChunkType(chunk.type))
-                if not enhancer:
-                    return chunk
-                return await enhancer.enhance(chunk)
-
-        text_tasks = [enhance_with_semaphore(chunk, semaphore) for chunk in parse_result.texts]
-        table_tasks = [enhance_with_semaphore(chunk, semaphore) for chunk in parse_result.tables]
-        image_tasks = [enhance_with_semaphore(chunk, semaphore) for chunk in parse_result.images]
-        formula_tasks = [enhance_with_semaphore(chunk, semaphore) for chunk in parse_result.formulas]
-
-        text_chunk_list = await asyncio.gather(*text_tasks)
-        table_chunk_list = await asyncio.gather(*table_tasks)
-        image_chunk_list = await asyncio.gather(*image_tasks)
-        formula_chunk_list = await asyncio.gather(*formula_tasks)
-
-        parse_result.texts = text_chunk_list
-        parse_result.tables = table_chunk_list
-        parse_result.images = image_chunk_list
-        parse_result.formulas = formula_chunk_list
-        return parse_result.model_dump(mode="json")
+        # 同一批任务的文件并发解析，单个文件失败不影响其他文件
+        results = await parse_many([task.get("file_path", "") for task in tasks], concurrency=TASK_BATCH_SIZE)
+        for task, result in zip(tasks, results, strict=True):
+            await _save_result(task_manager, task["task_id"], result)
+
+
+async def _save_result(task_manager: TaskManager, task_id: str, result: DocumentData | BaseException | None) -> None:
+    """增强并写回单个任务的解析结果，没有解析器或解析失败的任务标记为 failed"""
+    if isinstance(result, BaseException):
+        logger.error("解析任务失败: %s, 错误: %s", task_id, result)
+        await task_manager.update_task_status(task_id, "failed")
+        return
+    if result is None or not result.success:
+        await task_manager.update_task_status(task_id, "failed")
+        return
+    await task_manager.update_task_status(task_id, "completed", await _enhance_result(result))
+
+
+async def _enhance_result(parse_result: DocumentData) -> dict[str, Any]:
+    """并发增强解析结果中的所有块，返回可序列化的结果字典"""
+    # 所有模态的块一起并发增强，再按原顺序切分回各自列表
+    texts, tables, images = parse_result.texts, parse_result.tables, parse_result.images
+    enhanced = await enhance_chunks(
+        [*texts, *tables, *images, *parse_result.formulas], concurrency=SEMAPHORE_LIMIT
+    )
+    table_start = len(texts)
+    image_start = table_start + len(tables)
+    formula_start = image_start + len(images)
+
+    parse_result.texts = enhanced[:table_start]
+    parse_result.tables = enhanced[table_start:image_start]
+    parse_result.images = enhanced[image_start:formula_start]
+    parse_result.formulas = enhanced[formula_start:]
+    return asdict(parse_result)